@@ -0,0 +1,67 @@
+# benchmarks/render.py
+"""Har bir grafik turi uchun chizish kechikishi (median, ms)
+
+Ishlatish: python benchmarks/render.py [--points 300 5000 50000] [--repeat 5]
+"""
+import argparse
+import os
+import sys
+import time
+import types
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from visualizer import Visualizer  # noqa: E402
+
+
+def _fake_results(n, rng):
+    """Chizish uchun K-Means/DBSCAN natijalariga o'xshash obyektlar"""
+    X = rng.randn(n, 2)
+    labels = (X[:, 0] > 0).astype(int) + 2 * (X[:, 1] > 0)
+    kmeans = types.SimpleNamespace(
+        labels=labels, centroids=np.array([[1, 1], [-1, 1], [1, -1], [-1, -1.0]]))
+    dbscan_labels = labels.copy()
+    dbscan_labels[rng.rand(n) < 0.05] = -2
+    dbscan = types.SimpleNamespace(labels=dbscan_labels,
+                                   core_points=np.flatnonzero(rng.rand(n) < 0.5))
+    return X, kmeans, dbscan
+
+
+def _median_ms(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return np.median(times) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--points', type=int, nargs='+', default=[300, 5000, 50000])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    rng = np.random.RandomState(0)
+    Visualizer.warm_up()
+
+    print(f"{'nuqtalar':>10} {'grafik':>12} {'ms':>10}")
+    for n in args.points:
+        X, kmeans, dbscan = _fake_results(n, rng)
+        k_distances = np.sort(rng.rand(n))
+        charts = {
+            'kmeans': lambda: Visualizer.plot_kmeans(X, kmeans),
+            'dbscan': lambda: Visualizer.plot_dbscan(X, dbscan),
+            'comparison': lambda: Visualizer.plot_comparison(X, kmeans, dbscan),
+            # Elbow keshini chetlab o'tish uchun har safar boshqa qiymatlar
+            'elbow': lambda: Visualizer.plot_elbow(range(1, 11), rng.rand(10)),
+            'k_distance': lambda: Visualizer.plot_k_distance(k_distances, 5, 0.3),
+        }
+        for name, fn in charts.items():
+            print(f"{n:>10} {name:>12} {_median_ms(fn, args.repeat):>10.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,212 @@
+# benchmarks/suite.py
+"""Clustering engine va Visualizer uchun benchmark to'plami
+
+Har bir holat seed li datasetda ishlaydi; wall time, eng yuqori xotira
+(tracemalloc) va iteratsiyalar soni JSON faylga yoziladi. --baseline
+berilsa, natijalar u bilan taqqoslanadi va chegaradan oshgan regressiyada
+dastur 1 kodi bilan tugaydi.
+
+Ishlatish:
+    python benchmarks/suite.py --quick --output results.json
+    python benchmarks/suite.py --save-baseline benchmarks/baseline.json
+    python benchmarks/suite.py --baseline benchmarks/baseline.json --time-threshold 0.25
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from clustering_engine import KMeans, MiniBatchKMeans, DBSCAN, ElbowMethod  # noqa: E402
+from visualizer import Visualizer  # noqa: E402
+import config  # noqa: E402
+
+POINTS = [1000, 10000, 100000, 1000000]
+QUICK_POINTS = [1000, 10000]
+DIMS = [2, 10, 50]
+
+
+def make_dataset(n, dims, n_centers=5, seed=0):
+    """Seed li Gauss klasterlari"""
+    rng = np.random.RandomState(seed)
+    centers = rng.uniform(-10, 10, size=(n_centers, dims))
+    labels = rng.randint(n_centers, size=n)
+    return centers[labels] + rng.randn(n, dims)
+
+
+def _kmeans(X):
+    model = KMeans(k=5, max_iters=config.DEFAULT_KMEANS_ITERATIONS, random_state=42,
+                   n_init=config.DEFAULT_KMEANS_N_INIT,
+                   algorithm=config.DEFAULT_KMEANS_ALGORITHM).fit(X)
+    return {'n_iter': model.n_iter_}
+
+
+def _minibatch(X):
+    model = MiniBatchKMeans(k=5, random_state=42).fit(X)
+    return {'n_iter': model.n_iter_}
+
+
+def _dbscan(X):
+    # Yuqori o'lchamda masofalar o'sadi - eps ni moslashtirish
+    eps = 0.5 * np.sqrt(X.shape[1] / 2)
+    model = DBSCAN(eps=eps, min_pts=5).fit(X)
+    return {'n_clusters': model.n_clusters_}
+
+
+def _elbow(X):
+    # Har bir o'lchashda keshni chetlab o'tish
+    ElbowMethod._cache.clear()
+    ElbowMethod.calculate(X, max_k=10, estimator=MiniBatchKMeans if len(X) > 50000 else KMeans)
+    return {}
+
+
+def _plot_kmeans(X):
+    model = MiniBatchKMeans(k=5, random_state=42).fit(X)
+    start = time.perf_counter()
+    size = len(Visualizer.plot_kmeans(X, model).getvalue())
+    return {'render_s': time.perf_counter() - start, 'bytes': size}
+
+
+def _plot_dbscan(X):
+    model = DBSCAN(eps=0.5, min_pts=5).fit(X)
+    start = time.perf_counter()
+    size = len(Visualizer.plot_dbscan(X, model).getvalue())
+    return {'render_s': time.perf_counter() - start, 'bytes': size}
+
+
+# nom -> (funksiya, maksimal nuqtalar, o'lchamlar)
+CASES = {
+    'kmeans': (_kmeans, 1000000, DIMS),
+    'minibatch_kmeans': (_minibatch, 1000000, DIMS),
+    'dbscan': (_dbscan, 100000, DIMS),
+    'elbow': (_elbow, 100000, [2, 10]),
+    'plot_kmeans': (_plot_kmeans, 1000000, [2]),
+    'plot_dbscan': (_plot_dbscan, 100000, [2]),
+}
+
+
+def run_case(name, fn, n, dims, repeat):
+    """Bitta holat: eng yaxshi wall time, eng yuqori xotira va qo'shimcha ko'rsatkichlar
+
+    tracemalloc Python kodini sekinlashtiradi, shuning uchun vaqt va xotira
+    alohida ishga tushirishlarda o'lchanadi.
+    """
+    # Importlar va birinchi chaqiruv xarajatlari o'lchovga tushmasligi uchun
+    fn(make_dataset(200, dims, seed=1))
+
+    X = make_dataset(n, dims)
+    times = []
+    extra = {}
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        extra = fn(X)
+        times.append(time.perf_counter() - start)
+
+    gc.collect()
+    tracemalloc.start()
+    fn(X)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return {
+        'case': f"{name}/n={n}/d={dims}",
+        'name': name,
+        'n': n,
+        'dims': dims,
+        'wall_s': min(times),
+        'peak_mb': peak / 1024 / 1024,
+        **extra,
+    }
+
+
+def compare(results, baseline, time_threshold, memory_threshold):
+    """Bazaviy natijalar bilan taqqoslash; regressiyalar ro'yxati"""
+    base = {r['case']: r for r in baseline['results']}
+    regressions = []
+    print(f"\n{'holat':<36} {'vaqt':>10} {'baza':>10} {'o`zg.':>8} {'MB':>8} {'baza MB':>8}")
+    for r in results:
+        b = base.get(r['case'])
+        if b is None:
+            continue
+        time_change = r['wall_s'] / b['wall_s'] - 1 if b['wall_s'] else 0.0
+        memory_change = r['peak_mb'] / b['peak_mb'] - 1 if b['peak_mb'] else 0.0
+        flag = ''
+        if time_change > time_threshold:
+            flag += ' VAQT'
+        if memory_change > memory_threshold:
+            flag += ' XOTIRA'
+        if flag:
+            regressions.append(r['case'])
+        print(f"{r['case']:<36} {r['wall_s']:>9.3f}s {b['wall_s']:>9.3f}s "
+              f"{time_change:>+7.0%} {r['peak_mb']:>8.1f} {b['peak_mb']:>8.1f}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--quick', action='store_true', help="faqat 1k va 10k nuqta")
+    parser.add_argument('--points', type=int, nargs='+', help="nuqtalar soni ro'yxati")
+    parser.add_argument('--dims', type=int, nargs='+', help="o'lchamlar ro'yxati")
+    parser.add_argument('--cases', nargs='+', choices=sorted(CASES), help="faqat shu holatlar")
+    parser.add_argument('--repeat', type=int, default=1)
+    parser.add_argument('--output', default='benchmark_results.json')
+    parser.add_argument('--baseline', help="taqqoslash uchun bazaviy JSON")
+    parser.add_argument('--save-baseline', help="natijalarni bazaviy sifatida saqlash")
+    parser.add_argument('--time-threshold', type=float, default=0.2,
+                        help="ruxsat etilgan vaqt o'sishi (0.2 = 20%%)")
+    parser.add_argument('--memory-threshold', type=float, default=0.2,
+                        help="ruxsat etilgan xotira o'sishi")
+    args = parser.parse_args()
+
+    points = args.points or (QUICK_POINTS if args.quick else POINTS)
+    Visualizer.warm_up()
+    results = []
+    for name in args.cases or CASES:
+        fn, max_points, case_dims = CASES[name]
+        for dims in case_dims:
+            if args.dims and dims not in args.dims:
+                continue
+            for n in points:
+                if n > max_points:
+                    continue
+                result = run_case(name, fn, n, dims, args.repeat)
+                results.append(result)
+                print(f"{result['case']:<36} {result['wall_s']:>9.3f}s "
+                      f"{result['peak_mb']:>9.1f} MB", flush=True)
+
+    report = {
+        'meta': {
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'machine': platform.machine(),
+            'cpu_count': os.cpu_count(),
+            'time': time.strftime('%Y-%m-%d %H:%M:%S'),
+        },
+        'results': results,
+    }
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    if args.save_baseline:
+        with open(args.save_baseline, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.time_threshold, args.memory_threshold)
+        if regressions:
+            print(f"\n{len(regressions)} ta regressiya: {', '.join(regressions)}")
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,17 +1,26 @@
 # bot.py
+import time
+_START = time.perf_counter()
+
+import functools
 import logging
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import (
     Application, CommandHandler, MessageHandler,
     CallbackQueryHandler, ConversationHandler, filters, ContextTypes
 )
-import numpy as np
-import pandas as pd
-import os
+import hashlib
 
 from database import Database
-from clustering_engine import KMeans, DBSCAN, ElbowMethod
+from telegram.error import TelegramError, BadRequest
+from compute import (ComputeExecutor, ComputeBusy, elbow_job, dbscan_setup_job,
+                     kmeans_job, dbscan_job, comparison_job)
+from scheduler import JobScheduler, JobCancelled, JobTimeout
+from result_cache import ResultCache, make_key
+from data_loader import load_upload, UploadError, UploadCache
+from dataset_store import DatasetStore, DatasetExpired
 from visualizer import Visualizer
+from tracing import Tracer, span, record
 import config
 
 # Logging
@@ -21,26 +30,46 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+_IMPORTED = time.perf_counter()
+
 # Database
 db = Database()
+_DB_READY = time.perf_counter()
 
 # Conversation states
 (CHOOSING_ALGORITHM, CHOOSING_DATASET, CHOOSING_SOURCE,
  UPLOADING_FILE, KMEANS_K, KMEANS_CONFIRM,
  DBSCAN_EPS, DBSCAN_MINPTS, DBSCAN_CONFIRM) = range(9)
 
+HISTORY_PAGE_SIZE = 10
+
+
+def traced(handler):
+    """Handlerni trace ichida bajarish - bosqichlar Tracer histogrammalariga tushadi"""
+    @functools.wraps(handler)
+    async def wrapper(self, update, context):
+        async with self.tracer.trace(handler.__name__, update.effective_user.id):
+            return await handler(self, update, context)
+    return wrapper
+
 
 class ClusteringBot:
 
     def __init__(self):
         self.viz = Visualizer()
+        self.executor = ComputeExecutor()
+        self.scheduler = JobScheduler(self.executor)
+        self.results = ResultCache()
+        self.uploads = UploadCache()
+        self.datasets = DatasetStore()
+        self.tracer = Tracer(db)
 
     async def start(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Start komandasi"""
         user = update.effective_user
 
         # Foydalanuvchini bazaga qo'shish
-        db.add_user(user.id, user.username, user.first_name, user.last_name)
+        await db.add_user(user.id, user.username, user.first_name, user.last_name)
 
         welcome_text = f"""
 🤖 <b>Clustering Bot'ga Xush Kelibsiz!</b>
@@ -181,7 +210,7 @@ Fikr-mulohazalaringizni yuboring! 💬
 
         if choice == 'default':
             # Default datasetlarni ko'rsatish
-            datasets = db.get_default_datasets()
+            datasets = await db.get_default_datasets()
 
             keyboard = []
             for name, desc in datasets:
@@ -202,13 +231,14 @@ Fikr-mulohazalaringizni yuboring! 💬
             return CHOOSING_DATASET
 
         else:  # upload
+            max_rows = self.max_rows(context)
             await query.edit_message_text(
                 "📤 <b>CSV yoki Excel faylni yuboring:</b>\n\n"
                 "📋 Talablar:\n"
                 "• Maksimal hajm: 10 MB\n"
                 "• Format: CSV yoki XLSX\n"
                 "• Kamida 2 ta ustun\n"
-                "• Maksimal 10,000 qator\n\n"
+                f"• Maksimal {max_rows:,} qator\n\n"
                 "Bekor qilish uchun /cancel",
                 parse_mode='HTML'
             )
@@ -223,9 +253,10 @@ Fikr-mulohazalaringizni yuboring! 💬
         dataset_name = query.data.replace('dataset_', '')
         context.user_data['dataset_name'] = dataset_name
 
-        # Datasetni yuklash
-        data = db.get_dataset_by_name(dataset_name)
-        context.user_data['data'] = np.array(data)
+        # Datasetni omborga yozish - user_data da faqat handle qoladi
+        data = await db.get_dataset_by_name(dataset_name)
+        context.user_data['dataset'] = self.datasets.put(data)
+        context.user_data['n_rows'] = len(data)
 
         await query.edit_message_text(
             f"✅ Dataset tanlandi: <b>{dataset_name}</b>\n"
@@ -237,6 +268,7 @@ Fikr-mulohazalaringizni yuboring! 💬
         # Algoritmga qarab keyingi qadamga o'tish
         return await self.setup_algorithm_params(update, context)
 
+    @traced
     async def file_uploaded(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Fayl yuklandi"""
         file = update.message.document
@@ -256,97 +288,80 @@ Fikr-mulohazalaringizni yuboring! 💬
             )
             return UPLOADING_FILE
 
-        # Faylni yuklab olish
-        new_file = await file.get_file()
-        file_path = os.path.join(config.UPLOAD_FOLDER, f"{update.effective_user.id}_{file.file_name}")
-        await new_file.download_to_drive(file_path)
-
-        try:
-            # Faylni o'qish
-            if file_ext == 'csv':
-                df = pd.read_csv(file_path)
-            else:
-                df = pd.read_excel(file_path)
+        max_rows = self.max_rows(context)
 
-            # Tekshirish
-            if len(df.columns) < 2:
-                await update.message.reply_text(
-                    "❌ Kamida 2 ta ustun bo'lishi kerak!"
-                )
+        # Ilgari yuborilgan fayl - yuklab olish va parse qilish shart emas
+        cached = self.uploads.get(file.file_unique_id, file.file_size)
+        if cached is not None:
+            X, columns = cached
+            if len(X) > max_rows:
+                await update.message.reply_text(f"❌ Juda ko'p qator! (Maks: {max_rows})")
                 return UPLOADING_FILE
-
-            if len(df) > config.MAX_ROWS:
-                await update.message.reply_text(
-                    f"❌ Juda ko'p qator! (Maks: {config.MAX_ROWS})"
-                )
+        else:
+            # Faylni diskka emas, xotiraga yuklab olish
+            with span('download'):
+                new_file = await file.get_file()
+                data = bytes(await new_file.download_as_bytearray())
+
+            try:
+                # Faqat kerakli ustunlar, qatorlar chegarasi bilan o'qiladi
+                with span('parse'):
+                    X, columns = load_upload(data, file_ext, max_rows)
+            except UploadError as e:
+                await update.message.reply_text(str(e))
                 return UPLOADING_FILE
-
-            # Faqat birinchi 2 ta raqamli ustunni olish
-            numeric_cols = df.select_dtypes(include=[np.number]).columns[:2]
-
-            if len(numeric_cols) < 2:
+            except Exception as e:
+                logger.error(f"Fayl o'qishda xato: {e}")
                 await update.message.reply_text(
-                    "❌ Kamida 2 ta raqamli ustun bo'lishi kerak!"
+                    "❌ Faylni o'qishda xatolik yuz berdi!"
                 )
                 return UPLOADING_FILE
 
-            X = df[numeric_cols].values
-
-            context.user_data['data'] = X
-            context.user_data['dataset_name'] = file.file_name
-
-            await update.message.reply_text(
-                f"✅ <b>Fayl yuklandi!</b>\n\n"
-                f"📊 Qatorlar: {len(X)}\n"
-                f"📈 Ustunlar: {', '.join(numeric_cols)}\n\n"
-                "⏳ Parametrlarni sozlang...",
-                parse_mode='HTML'
-            )
+            self.uploads.put(file.file_unique_id, X, columns)
 
-            # Faylni o'chirish
-            os.remove(file_path)
+        with span('store'):
+            context.user_data['dataset'] = self.datasets.put(X)
+        context.user_data['n_rows'] = len(X)
+        context.user_data['dataset_name'] = file.file_name
 
-            # Parametrlarni sozlash
-            return await self.setup_algorithm_params(update, context)
+        await update.message.reply_text(
+            f"✅ <b>Fayl yuklandi!</b>\n\n"
+            f"📊 Qatorlar: {len(X)}\n"
+            f"📈 Ustunlar: {', '.join(columns)}\n\n"
+            "⏳ Parametrlarni sozlang...",
+            parse_mode='HTML'
+        )
 
-        except Exception as e:
-            logger.error(f"Fayl o'qishda xato: {e}")
-            await update.message.reply_text(
-                "❌ Faylni o'qishda xatolik yuz berdi!"
-            )
-            return UPLOADING_FILE
+        # Parametrlarni sozlash
+        return await self.setup_algorithm_params(update, context)
 
+    @traced
     async def setup_algorithm_params(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Algoritm parametrlarini sozlash"""
         algorithm = context.user_data.get('algorithm')
-        X = context.user_data.get('data')
+        n_rows = context.user_data.get('n_rows')
 
         if algorithm == 'kmeans':
             # Elbow method
             await self.send_typing(update, context)
-            k_range, inertias = ElbowMethod.calculate(X, max_k=10)
+            msg = update.callback_query.message if update.callback_query else update.message
+            key = make_key(context.user_data['dataset'], 'elbow', max_k=10)
+            result = await self.cached_job(update, msg, context, key, elbow_job, 10)
+            if result is None:
+                return ConversationHandler.END
 
             # Elbow grafigini yuborish
-            elbow_img = self.viz.plot_elbow(k_range, inertias)
+            elbow_img = result['image']
 
-            if update.callback_query:
-                await update.callback_query.message.reply_photo(
-                    photo=elbow_img,
-                    caption="📊 <b>Elbow Method</b>\n\n"
-                            "Optimal K ni tanlash uchun 'tirsak' nuqtasini qidiring!",
-                    parse_mode='HTML'
-                )
-            else:
-                await update.message.reply_photo(
-                    photo=elbow_img,
-                    caption="📊 <b>Elbow Method</b>\n\n"
-                            "Optimal K ni tanlash uchun 'tirsak' nuqtasini qidiring!",
-                    parse_mode='HTML'
-                )
+            await self.send_photo(
+                msg, elbow_img,
+                caption="📊 <b>Elbow Method</b>\n\n"
+                        "Optimal K ni tanlash uchun 'tirsak' nuqtasini qidiring!"
+            )
 
             # K ni tanlash
             keyboard = []
-            for k in range(2, min(11, len(X))):
+            for k in range(2, min(11, n_rows)):
                 keyboard.append([InlineKeyboardButton(f"K = {k}", callback_data=f'k_{k}')])
 
             reply_markup = InlineKeyboardMarkup(keyboard)
@@ -367,9 +382,33 @@ Fikr-mulohazalaringizni yuboring! 💬
             return KMEANS_K
 
         elif algorithm == 'dbscan':
+            msg = update.callback_query.message if update.callback_query else update.message
+            await self.send_typing(update, context)
+
+            # Radius grafi bir marta quriladi - keyingi eps/MinPts juftliklari tezkor
+            key = make_key(context.user_data['dataset'], 'dbscan_setup',
+                           min_pts=config.DEFAULT_DBSCAN_MIN_PTS,
+                           max_eps=config.DBSCAN_MAX_EPS)
+            result = await self.cached_job(update, msg, context, key, dbscan_setup_job)
+            if result is None:
+                return ConversationHandler.END
+
             keyboard = []
+            suggested = result['suggested_eps']
+            if suggested is not None:
+                await self.send_photo(
+                    msg, result['image'],
+                    caption="📉 <b>k-distance grafigi</b>\n\n"
+                            f"Tavsiya etilgan epsilon: <b>{suggested}</b>"
+                )
+
+                keyboard.append([InlineKeyboardButton(
+                    f"💡 ε = {suggested} (tavsiya)",
+                    callback_data=f'eps_{suggested}'
+                )])
+
             # Epsilon qiymatlari
-            for eps in [0.1, 0.2, 0.3, 0.5, 0.8, 1.0]:
+            for eps in result['eps_values']:
                 keyboard.append([InlineKeyboardButton(
                     f"ε = {eps}",
                     callback_data=f'eps_{eps}'
@@ -378,20 +417,12 @@ Fikr-mulohazalaringizni yuboring! 💬
 
             reply_markup = InlineKeyboardMarkup(keyboard)
 
-            if update.callback_query:
-                await update.callback_query.message.reply_text(
-                    "📏 <b>Epsilon (ε) qiymatini tanlang:</b>\n\n"
-                    "Bu qo'shni nuqtalar orasidagi maksimal masofa.",
-                    reply_markup=reply_markup,
-                    parse_mode='HTML'
-                )
-            else:
-                await update.message.reply_text(
-                    "📏 <b>Epsilon (ε) qiymatini tanlang:</b>\n\n"
-                    "Bu qo'shni nuqtalar orasidagi maksimal masofa.",
-                    reply_markup=reply_markup,
-                    parse_mode='HTML'
-                )
+            await msg.reply_text(
+                "📏 <b>Epsilon (ε) qiymatini tanlang:</b>\n\n"
+                "Bu qo'shni nuqtalar orasidagi maksimal masofa.",
+                reply_markup=reply_markup,
+                parse_mode='HTML'
+            )
 
             return DBSCAN_EPS
 
@@ -428,6 +459,7 @@ Fikr-mulohazalaringizni yuboring! 💬
 
         return KMEANS_CONFIRM
 
+    @traced
     async def kmeans_confirmed(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """K-Means tahlilni boshlash"""
         query = update.callback_query
@@ -440,18 +472,23 @@ Fikr-mulohazalaringizni yuboring! 💬
         await query.edit_message_text("⏳ <b>Tahlil boshlanmoqda...</b>", parse_mode='HTML')
 
         # Ma'lumotlarni olish
-        X = context.user_data.get('data')
         k = context.user_data.get('k')
 
-        # K-Means
-        kmeans = KMeans(k=k, max_iters=config.DEFAULT_KMEANS_ITERATIONS, random_state=42)
-        kmeans.fit(X)
+        # K-Means va grafik hisoblash pulida (yoki keshdan)
+        key = make_key(context.user_data['dataset'], 'kmeans', k=k,
+                       max_iters=config.DEFAULT_KMEANS_ITERATIONS,
+                       n_init=config.DEFAULT_KMEANS_N_INIT,
+                       algorithm=config.DEFAULT_KMEANS_ALGORITHM)
+        result = await self.cached_job(update, query.message, context, key, kmeans_job, k)
+        if result is None:
+            return ConversationHandler.END
+        logger.info(f"K-Means: {result['n_iter']} iteratsiya, "
+                    f"{result['n_distances_skipped']} masofa hisoblanmadi")
 
-        # Grafik
-        img = self.viz.plot_kmeans(X, kmeans, f"K-Means (K={k})")
+        img = result['image']
 
         # Klaster ma'lumotlari
-        cluster_info = kmeans.get_cluster_info()
+        cluster_info = result['cluster_info']
         info_text = "📊 <b>Klaster Ma'lumotlari:</b>\n\n"
 
         for cluster in cluster_info:
@@ -463,19 +500,15 @@ Fikr-mulohazalaringizni yuboring! 💬
 
         info_text += (
             f"📈 <b>Umumiy:</b>\n"
-            f"   • Iteratsiyalar: {kmeans.n_iter_}\n"
-            f"   • Inertia: {kmeans.inertia_:.2f}"
+            f"   • Iteratsiyalar: {result['n_iter']}\n"
+            f"   • Inertia: {result['inertia']:.2f}"
         )
 
         # Yuborish
-        await query.message.reply_photo(
-            photo=img,
-            caption=info_text,
-            parse_mode='HTML'
-        )
+        await self.send_photo(query.message, img, caption=info_text)
 
         # Bazaga saqlash
-        db.add_analysis(
+        await db.add_analysis(
             user_id=update.effective_user.id,
             algorithm='K-Means',
             dataset_name=context.user_data.get('dataset_name'),
@@ -498,7 +531,7 @@ Fikr-mulohazalaringizni yuboring! 💬
 
         if query.data == 'eps_custom':
             await query.edit_message_text(
-                "✏️ Epsilon qiymatini yozing (0.1 - 2.0):\n\n"
+                f"✏️ Epsilon qiymatini yozing (0.1 - {config.DBSCAN_MAX_EPS}):\n\n"
                 "Bekor qilish: /cancel"
             )
             context.user_data['waiting_custom_eps'] = True
@@ -536,8 +569,10 @@ Fikr-mulohazalaringizni yuboring! 💬
         try:
             eps = float(update.message.text)
 
-            if eps < 0.1 or eps > 2.0:
-                await update.message.reply_text("❌ Qiymat 0.1 - 2.0 oralig'ida bo'lishi kerak!")
+            if eps < 0.1 or eps > config.DBSCAN_MAX_EPS:
+                await update.message.reply_text(
+                    f"❌ Qiymat 0.1 - {config.DBSCAN_MAX_EPS} oralig'ida bo'lishi kerak!"
+                )
                 return DBSCAN_EPS
 
             context.user_data['eps'] = eps
@@ -575,7 +610,7 @@ Fikr-mulohazalaringizni yuboring! 💬
 
         if query.data == 'minpts_custom':
             await query.edit_message_text(
-                "✏️ MinPts qiymatini yozing (3 - 20):\n\n"
+                f"✏️ MinPts qiymatini yozing (3 - {config.DBSCAN_MAX_MIN_PTS}):\n\n"
                 "Bekor qilish: /cancel"
             )
             context.user_data['waiting_custom_minpts'] = True
@@ -613,8 +648,10 @@ Fikr-mulohazalaringizni yuboring! 💬
         try:
             minpts = int(update.message.text)
 
-            if minpts < 3 or minpts > 20:
-                await update.message.reply_text("❌ Qiymat 3 - 20 oralig'ida bo'lishi kerak!")
+            if minpts < 3 or minpts > config.DBSCAN_MAX_MIN_PTS:
+                await update.message.reply_text(
+                    f"❌ Qiymat 3 - {config.DBSCAN_MAX_MIN_PTS} oralig'ida bo'lishi kerak!"
+                )
                 return DBSCAN_MINPTS
 
             context.user_data['minpts'] = minpts
@@ -645,6 +682,7 @@ Fikr-mulohazalaringizni yuboring! 💬
             await update.message.reply_text("❌ Noto'g'ri format! Butun son kiriting.")
             return DBSCAN_MINPTS
 
+    @traced
     async def dbscan_confirmed(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """DBSCAN tahlilni boshlash"""
         query = update.callback_query
@@ -657,19 +695,20 @@ Fikr-mulohazalaringizni yuboring! 💬
         await query.edit_message_text("⏳ <b>Tahlil boshlanmoqda...</b>", parse_mode='HTML')
 
         # Ma'lumotlarni olish
-        X = context.user_data.get('data')
         eps = context.user_data.get('eps')
         minpts = context.user_data.get('minpts')
 
-        # DBSCAN
-        dbscan = DBSCAN(eps=eps, min_pts=minpts)
-        dbscan.fit(X)
+        # DBSCAN va grafik hisoblash pulida (yoki keshdan)
+        key = make_key(context.user_data['dataset'], 'dbscan', eps=eps, min_pts=minpts)
+        result = await self.cached_job(update, query.message, context, key,
+                                       dbscan_job, eps, minpts)
+        if result is None:
+            return ConversationHandler.END
 
-        # Grafik
-        img = self.viz.plot_dbscan(X, dbscan, f"DBSCAN (ε={eps}, MinPts={minpts})")
+        img = result['image']
 
         # Klaster ma'lumotlari
-        cluster_info = dbscan.get_cluster_info()
+        cluster_info = result['cluster_info']
         info_text = "📊 <b>Klaster Ma'lumotlari:</b>\n\n"
 
         for cluster in cluster_info:
@@ -681,26 +720,22 @@ Fikr-mulohazalaringizni yuboring! 💬
 
         info_text += (
             f"📈 <b>Umumiy:</b>\n"
-            f"   • Topilgan klasterlar: {dbscan.n_clusters_}\n"
-            f"   • Shovqin nuqtalari: {dbscan.n_noise_}\n"
-            f"   • Core Points: {len(dbscan.core_points)}"
+            f"   • Topilgan klasterlar: {result['n_clusters']}\n"
+            f"   • Shovqin nuqtalari: {result['n_noise']}\n"
+            f"   • Core Points: {result['n_core_points']}"
         )
 
         # Yuborish
-        await query.message.reply_photo(
-            photo=img,
-            caption=info_text,
-            parse_mode='HTML'
-        )
+        await self.send_photo(query.message, img, caption=info_text)
 
         # Bazaga saqlash
-        db.add_analysis(
+        await db.add_analysis(
             user_id=update.effective_user.id,
             algorithm='DBSCAN',
             dataset_name=context.user_data.get('dataset_name'),
             parameters={'eps': eps, 'minpts': minpts},
-            n_clusters=dbscan.n_clusters_,
-            n_noise_points=dbscan.n_noise_
+            n_clusters=result['n_clusters'],
+            n_noise_points=result['n_noise']
         )
 
         await query.message.reply_text(
@@ -711,6 +746,7 @@ Fikr-mulohazalaringizni yuboring! 💬
 
         return ConversationHandler.END
 
+    @traced
     async def run_comparison(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Algoritmlarni taqqoslash"""
         if update.callback_query:
@@ -721,103 +757,281 @@ Fikr-mulohazalaringizni yuboring! 💬
 
         await msg.reply_text("⏳ <b>Taqqoslash boshlanmoqda...</b>", parse_mode='HTML')
 
-        X = context.user_data.get('data')
-
-        # K-Means
-        kmeans = KMeans(k=3, random_state=42)
-        kmeans.fit(X)
-
-        # DBSCAN
-        dbscan = DBSCAN(eps=0.3, min_pts=5)
-        dbscan.fit(X)
+        # K-Means, DBSCAN va taqqoslash grafigi hisoblash pulida (yoki keshdan)
+        key = make_key(context.user_data['dataset'], 'comparison', k=3, eps=0.3, min_pts=5,
+                       n_init=config.DEFAULT_KMEANS_N_INIT,
+                       algorithm=config.DEFAULT_KMEANS_ALGORITHM)
+        result = await self.cached_job(update, msg, context, key, comparison_job, 3, 0.3, 5)
+        if result is None:
+            return
+        kmeans, dbscan = result['kmeans'], result['dbscan']
 
-        # Taqqoslash grafigi
-        img = self.viz.plot_comparison(X, kmeans, dbscan)
+        img = result['image']
 
         comparison_text = (
             "⚖️ <b>Algoritmlar Taqqoslash</b>\n\n"
             "<b>K-Means:</b>\n"
-            f"   • Klasterlar: {kmeans.k}\n"
-            f"   • Inertia: {kmeans.inertia_:.2f}\n"
-            f"   • Iteratsiyalar: {kmeans.n_iter_}\n\n"
+            f"   • Klasterlar: {kmeans['n_clusters']}\n"
+            f"   • Inertia: {kmeans['inertia']:.2f}\n"
+            f"   • Iteratsiyalar: {kmeans['n_iter']}\n\n"
             "<b>DBSCAN:</b>\n"
-            f"   • Klasterlar: {dbscan.n_clusters_}\n"
-            f"   • Shovqin: {dbscan.n_noise_}\n"
-            f"   • Core Points: {len(dbscan.core_points)}\n\n"
+            f"   • Klasterlar: {dbscan['n_clusters']}\n"
+            f"   • Shovqin: {dbscan['n_noise']}\n"
+            f"   • Core Points: {dbscan['n_core_points']}\n\n"
             "💡 <b>Xulosa:</b>\n"
             "K-Means dumaloq klasterlar uchun, DBSCAN murakkab shakllar uchun yaxshi!"
         )
 
-        await msg.reply_photo(
-            photo=img,
-            caption=comparison_text,
-            parse_mode='HTML'
-        )
+        await self.send_photo(msg, img, caption=comparison_text)
 
         # Bazaga saqlash
-        db.add_analysis(
+        await db.add_analysis(
             user_id=update.effective_user.id,
             algorithm='Comparison',
             dataset_name=context.user_data.get('dataset_name'),
             parameters={'kmeans_k': 3, 'dbscan_eps': 0.3},
-            n_clusters=kmeans.k
+            n_clusters=kmeans['n_clusters']
         )
 
     async def history(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Tahlillar tarixi"""
-        user_id = update.effective_user.id
-        history = db.get_user_history(user_id, limit=10)
+        text, reply_markup = await self.history_page(update.effective_user.id)
+        await update.message.reply_text(text, reply_markup=reply_markup, parse_mode='HTML')
 
-        if not history:
-            await update.message.reply_text(
-                "📭 <b>Tarix bo'sh!</b>\n\n"
-                "Birinchi tahlil uchun /analyze",
-                parse_mode='HTML'
-            )
-            return
+    async def history_navigate(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Tarix sahifalari orasida o'tish"""
+        query = update.callback_query
+        await query.answer()
+
+        _, direction, analysis_id = query.data.split('_')
+        if direction == 'older':
+            text, reply_markup = await self.history_page(update.effective_user.id,
+                                                         before_id=int(analysis_id))
+        else:
+            text, reply_markup = await self.history_page(update.effective_user.id,
+                                                         after_id=int(analysis_id))
+
+        await query.edit_message_text(text, reply_markup=reply_markup, parse_mode='HTML')
 
-        text = "📜 <b>Oxirgi 10 ta Tahlil:</b>\n\n"
+    async def history_page(self, user_id, before_id=None, after_id=None):
+        """Tarix sahifasi matni va navigatsiya tugmalari"""
+        rows, has_older, has_newer = await db.get_user_history(
+            user_id, limit=HISTORY_PAGE_SIZE, before_id=before_id, after_id=after_id)
 
-        for i, (algo, dataset, n_clusters, date) in enumerate(history, 1):
+        if not rows:
+            return ("📭 <b>Tarix bo'sh!</b>\n\n"
+                    "Birinchi tahlil uchun /analyze"), None
+
+        text = "📜 <b>Tahlillar Tarixi:</b>\n\n"
+
+        for analysis_id, algo, dataset, n_clusters, date in rows:
             text += (
-                f"{i}. <b>{algo}</b>\n"
+                f"#{analysis_id} <b>{algo}</b>\n"
                 f"   📊 Dataset: {dataset}\n"
                 f"   🔢 Klasterlar: {n_clusters}\n"
                 f"   📅 Sana: {date}\n\n"
             )
 
-        await update.message.reply_text(text, parse_mode='HTML')
+        buttons = []
+        if has_newer:
+            buttons.append(InlineKeyboardButton("⬅️ Yangilari",
+                                                callback_data=f'history_newer_{rows[0][0]}'))
+        if has_older:
+            buttons.append(InlineKeyboardButton("Eskilari ➡️",
+                                                callback_data=f'history_older_{rows[-1][0]}'))
+
+        return text, InlineKeyboardMarkup([buttons]) if buttons else None
 
     async def stats(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Statistika"""
         user_id = update.effective_user.id
-        stats = db.get_user_stats(user_id)
+        stats = await db.get_user_stats(user_id)
 
         if not stats:
             await update.message.reply_text("❌ Ma'lumot topilmadi.")
             return
 
-        total_analyses, join_date = stats
+        (join_date, total_analyses, n_kmeans, n_dbscan, n_comparison,
+         sum_clusters, last_dataset) = stats
+        avg_clusters = sum_clusters / total_analyses if total_analyses else 0
 
         text = (
             f"📊 <b>Sizning Statistikangiz</b>\n\n"
             f"👤 Foydalanuvchi: {update.effective_user.first_name}\n"
             f"📅 Qo'shilgan sana: {join_date}\n"
-            f"🔢 Jami tahlillar: {total_analyses}\n\n"
+            f"🔢 Jami tahlillar: {total_analyses}\n"
+            f"   • K-Means: {n_kmeans}\n"
+            f"   • DBSCAN: {n_dbscan}\n"
+            f"   • Taqqoslash: {n_comparison}\n"
+            f"📈 O'rtacha klasterlar: {avg_clusters:.1f}\n"
+            f"🗂 Oxirgi dataset: {last_dataset or '-'}\n\n"
             f"Davom eting! 🚀"
         )
 
         await update.message.reply_text(text, parse_mode='HTML')
 
+    async def perf(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Bosqichlar kechikishi - p50/p95/p99 (faqat adminlar uchun)"""
+        if update.effective_user.id not in config.ADMIN_IDS:
+            await update.message.reply_text("❌ Bu komanda faqat adminlar uchun.")
+            return
+
+        minutes = config.PERF_DEFAULT_WINDOW
+        if context.args and context.args[0].isdigit():
+            minutes = int(context.args[0])
+
+        summary = self.tracer.summary(minutes * 60)
+        if not summary:
+            await update.message.reply_text(f"📭 Oxirgi {minutes} daqiqada o'lchovlar yo'q.")
+            return
+
+        lines = [f"{'bosqich':<24}{'soni':>6}{'p50':>8}{'p95':>8}{'p99':>8}"]
+        for stage, (count, p50, p95, p99) in summary.items():
+            lines.append(f"{stage:<24}{count:>6}" +
+                         ''.join(f"{value * 1000:>8.0f}" for value in (p50, p95, p99)))
+        table = '\n'.join(lines)
+
+        await update.message.reply_text(
+            f"⏱ <b>Kechikish (ms), oxirgi {minutes} daqiqa</b>\n\n"
+            f"<pre>{table}</pre>",
+            parse_mode='HTML'
+        )
+
     async def cancel(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Bekor qilish"""
+        # Navbatdagi va bajarilayotgan ishlarni ham to'xtatish
+        n_cancelled = self.scheduler.cancel_user(update.effective_user.id)
+        text = "❌ Bekor qilindi."
+        if n_cancelled:
+            text += f" ({n_cancelled} ta tahlil to'xtatildi)"
+
         if update.message:
-            await update.message.reply_text("❌ Bekor qilindi.")
+            await update.message.reply_text(text)
         else:
-            await update.callback_query.message.reply_text("❌ Bekor qilindi.")
+            await update.callback_query.message.reply_text(text)
 
         return ConversationHandler.END
 
+    @staticmethod
+    def max_rows(context):
+        """Tanlangan algoritm uchun maksimal qatorlar soni"""
+        if context.user_data.get('algorithm') == 'kmeans':
+            return config.KMEANS_MAX_ROWS
+        return config.MAX_ROWS
+
+    async def run_job(self, update, msg, fn, *args, affinity=None):
+        """Ishni rejalashtiruvchi orqali bajarish (bajarilmasa foydalanuvchiga xabar, None)"""
+        status = None
+
+        async def on_position(position):
+            # Navbatdagi o'rin haqida jonli xabar
+            nonlocal status
+            if position:
+                text = f"⏳ Navbatdagi o'rningiz: <b>{position}</b>\n\nBekor qilish: /cancel"
+            elif status is not None:
+                text = "⚙️ <b>Tahlil bajarilmoqda...</b>\n\nBekor qilish: /cancel"
+            else:
+                return
+
+            if status is None:
+                status = await msg.reply_text(text, parse_mode='HTML')
+            else:
+                await status.edit_text(text, parse_mode='HTML')
+
+        try:
+            return await self.scheduler.submit(update.effective_user.id, fn, *args,
+                                               affinity=affinity,
+                                               on_position=on_position)
+        except ComputeBusy:
+            await msg.reply_text(
+                "⏳ <b>Server hozir band!</b>\n\n"
+                "Birozdan so'ng qayta urinib ko'ring: /analyze",
+                parse_mode='HTML'
+            )
+        except JobCancelled:
+            pass
+        except JobTimeout:
+            await msg.reply_text(
+                "⌛ <b>Tahlil juda uzoq davom etdi va to'xtatildi.</b>\n\n"
+                "Kichikroq parametrlar bilan qayta urinib ko'ring: /analyze",
+                parse_mode='HTML'
+            )
+        except Exception as e:
+            # Ishchi jarayon o'lgan (EOFError, OSError) yoki ishning o'zi xato bergan
+            logger.exception(f"Ish bajarilishida xato ({fn.__name__}): {e}")
+            await msg.reply_text(
+                "❌ <b>Tahlil vaqtida xatolik yuz berdi!</b>\n\n"
+                "Qayta urinib ko'ring: /analyze",
+                parse_mode='HTML'
+            )
+        finally:
+            if status is not None:
+                try:
+                    await status.delete()
+                except TelegramError:
+                    pass
+        return None
+
+    async def cached_job(self, update, msg, context, key, fn, *args):
+        """Natija keshda bo'lsa darhol qaytarish, aks holda hisoblash va keshlash"""
+        result = self.results.get(key)
+        if result is not None:
+            logger.info(f"Natija keshdan olindi ({fn.__name__}): {self.results.stats()}")
+            return result
+
+        result = await self.run_dataset_job(update, msg, context, fn, *args)
+        if result is not None:
+            self.results.put(key, result)
+        return result
+
+    async def run_dataset_job(self, update, msg, context, fn, *args):
+        """Foydalanuvchi datasetida ishni bajarish (ishchi faylni memory-map qiladi)"""
+        handle = context.user_data.get('dataset')
+        try:
+            # Navbatda kutayotganda boshqa foydalanuvchilar fayli o'chirmasligi uchun
+            path = self.datasets.pin(handle)
+        except DatasetExpired:
+            await msg.reply_text(
+                "⌛ <b>Dataset muddati tugadi.</b>\n\n"
+                "Qaytadan boshlang: /analyze",
+                parse_mode='HTML'
+            )
+            return None
+
+        # Ishchidagi bosqichlar (fit, render) ish nomi bilan yoziladi
+        name = fn.__name__.removesuffix('_job')
+        try:
+            with span(f"{name}.compute"):
+                # Bir dataset ishlari bitta ishchiga - uning keshlari qayta ishlatiladi
+                result = await self.run_job(update, msg, fn, path, *args, affinity=handle)
+        finally:
+            self.datasets.unpin(handle)
+        if result is not None:
+            record(result.pop('spans', []), prefix=f"{name}.")
+        return result
+
+    async def send_photo(self, msg, image, caption):
+        """Grafikni yuborish - avval yuborilgan bo'lsa, qayta yuklamasdan file_id orqali"""
+        with span('send'):
+            return await self._send_photo(msg, image, caption)
+
+    async def _send_photo(self, msg, image, caption):
+        content_hash = hashlib.blake2b(image, digest_size=16).hexdigest()
+
+        file_id = await db.get_photo_file_id(content_hash)
+        if file_id is not None:
+            try:
+                return await msg.reply_photo(photo=file_id, caption=caption, parse_mode='HTML')
+            except BadRequest as e:
+                # file_id eskirgan - qayta yuklash
+                logger.warning(f"file_id yaroqsiz, qayta yuklanadi: {e}")
+                await db.delete_photo_file_id(content_hash)
+
+        sent = await msg.reply_photo(photo=image, caption=caption, parse_mode='HTML')
+        if sent.photo:
+            await db.save_photo_file_id(content_hash, sent.photo[-1].file_id)
+        return sent
+
     async def send_typing(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Typing action"""
         if update.callback_query:
@@ -833,10 +1047,26 @@ def main():
     """Botni ishga tushirish"""
 
     # Bot instance
+    bot_start = time.perf_counter()
     bot = ClusteringBot()
 
+    async def post_init(application):
+        # Ishchilar (va ulardagi matplotlib) polling bilan parallel ishga tushadi
+        bot.executor.start()
+        await bot.tracer.load()
+        logger.info(f"Birinchi pollgacha: {time.perf_counter() - _START:.3f}s")
+
+    async def post_shutdown(application):
+        # Navbatdagi yozuvlarni yo'qotmaslik
+        await db.close()
+
     # Application
-    app = Application.builder().token(config.BOT_TOKEN).build()
+    # concurrent_updates o'chiq - ConversationHandler buni talab qiladi. Og'ir
+    # callback lar block=False: boshqa foydalanuvchilar kutmaydi, holat esa
+    # tahlil tugaguncha band (takroriy bosishlar e'tiborsiz qoldiriladi)
+    app_start = time.perf_counter()
+    app = (Application.builder().token(config.BOT_TOKEN)
+           .post_init(post_init).post_shutdown(post_shutdown).build())
 
     # Conversation Handler
     conv_handler = ConversationHandler(
@@ -844,13 +1074,15 @@ def main():
         states={
             CHOOSING_ALGORITHM: [CallbackQueryHandler(bot.algorithm_chosen, pattern='^algo_')],
             CHOOSING_SOURCE: [CallbackQueryHandler(bot.source_chosen, pattern='^source_')],
-            CHOOSING_DATASET: [CallbackQueryHandler(bot.dataset_chosen, pattern='^dataset_')],
+            CHOOSING_DATASET: [CallbackQueryHandler(bot.dataset_chosen, pattern='^dataset_',
+                                                    block=False)],
             UPLOADING_FILE: [
-                MessageHandler(filters.Document.ALL, bot.file_uploaded),
+                MessageHandler(filters.Document.ALL, bot.file_uploaded, block=False),
                 CommandHandler('cancel', bot.cancel)
             ],
             KMEANS_K: [CallbackQueryHandler(bot.kmeans_k_chosen, pattern='^k_')],
-            KMEANS_CONFIRM: [CallbackQueryHandler(bot.kmeans_confirmed, pattern='^confirm_')],
+            KMEANS_CONFIRM: [CallbackQueryHandler(bot.kmeans_confirmed, pattern='^confirm_',
+                                                  block=False)],
             DBSCAN_EPS: [
                 CallbackQueryHandler(bot.dbscan_eps_chosen, pattern='^eps_'),
                 MessageHandler(filters.TEXT & ~filters.COMMAND, bot.dbscan_custom_eps)
@@ -859,7 +1091,8 @@ def main():
                 CallbackQueryHandler(bot.dbscan_minpts_chosen, pattern='^minpts_'),
                 MessageHandler(filters.TEXT & ~filters.COMMAND, bot.dbscan_custom_minpts)
             ],
-            DBSCAN_CONFIRM: [CallbackQueryHandler(bot.dbscan_confirmed, pattern='^dbscan_confirm_')],
+            DBSCAN_CONFIRM: [CallbackQueryHandler(bot.dbscan_confirmed, pattern='^dbscan_confirm_',
+                                                  block=False)],
         },
         fallbacks=[
             CommandHandler('cancel', bot.cancel),
@@ -872,13 +1105,23 @@ def main():
     app.add_handler(CommandHandler('help', bot.help_command))
     app.add_handler(CommandHandler('about', bot.about_command))
     app.add_handler(CommandHandler('history', bot.history))
+    app.add_handler(CallbackQueryHandler(bot.history_navigate, pattern='^history_'))
     app.add_handler(CommandHandler('stats', bot.stats))
+    app.add_handler(CommandHandler('perf', bot.perf))
     app.add_handler(conv_handler)
+    app.add_handler(CommandHandler('cancel', bot.cancel))
 
     # Botni ishga tushirish
+    logger.info(
+        f"Ishga tushish bosqichlari: importlar {_IMPORTED - _START:.3f}s, "
+        f"baza {_DB_READY - _IMPORTED:.3f}s, bot {app_start - bot_start:.3f}s, "
+        f"application {time.perf_counter() - app_start:.3f}s"
+    )
     logger.info("🤖 Bot ishga tushdi!")
     app.run_polling(allowed_updates=Update.ALL_TYPES)
 
+    bot.executor.shutdown()
+
 
 if __name__ == '__main__':
     main()
\ No newline at end of file
@@ -1,67 +1,389 @@
 # clustering_engine.py
+import hashlib
+import os
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice, repeat
+
 import numpy as np
 
 
+# Masofa bloklari uchun xotira chegarasi (bayt)
+DISTANCE_MEMORY_BUDGET = 32 * 1024 * 1024
+# DBSCAN da bir so'rovda topiladigan qo'shnilar to'plamlari soni
+NEIGHBOR_BATCH = 512
+
+
+def _chunk_rows(n_rows, n_cols, memory_budget=DISTANCE_MEMORY_BUDGET):
+    """n_rows x n_cols float64 matritsani xotira chegarasiga sig'adigan bloklarga bo'lish"""
+    chunk = max(1, int(memory_budget // (8 * max(n_cols, 1))))
+    for start in range(0, n_rows, chunk):
+        yield slice(start, min(start + chunk, n_rows))
+
+
+def _squared_distance_blocks(X, C, X_sq=None, memory_budget=DISTANCE_MEMORY_BUDGET):
+    """||x||² - 2x·c + ||c||² kvadrat masofalarni qator bloklari bo'yicha qaytarish"""
+    if X_sq is None:
+        X_sq = np.einsum('ij,ij->i', X, X)
+    C_sq = np.einsum('ij,ij->i', C, C)
+
+    for rows in _chunk_rows(len(X), len(C), memory_budget):
+        block = X[rows] @ C.T
+        block *= -2
+        block += X_sq[rows, None]
+        block += C_sq
+        # Yaxlitlash xatolari manfiy qiymat berishi mumkin
+        np.maximum(block, 0, out=block)
+        yield rows, block
+
+
+def assign_nearest(X, C, X_sq=None, memory_budget=DISTANCE_MEMORY_BUDGET):
+    """Har bir nuqta uchun eng yaqin markaz va unga kvadrat masofa"""
+    labels = np.empty(len(X), dtype=np.intp)
+    min_distances = np.empty(len(X))
+    for rows, block in _squared_distance_blocks(X, C, X_sq, memory_budget):
+        labels[rows] = np.argmin(block, axis=1)
+        min_distances[rows] = block[np.arange(len(block)), labels[rows]]
+    return labels, min_distances
+
+
+def _two_nearest(X, C, X_sq=None, memory_budget=DISTANCE_MEMORY_BUDGET):
+    """Eng yaqin markaz, unga masofa va ikkinchi eng yaqin markazgacha masofa"""
+    labels = np.empty(len(X), dtype=np.intp)
+    nearest = np.empty(len(X))
+    second = np.full(len(X), np.inf)
+    for rows, block in _squared_distance_blocks(X, C, X_sq, memory_budget):
+        idx = np.arange(len(block))
+        labels[rows] = np.argmin(block, axis=1)
+        nearest[rows] = block[idx, labels[rows]]
+        if len(C) > 1:
+            block[idx, labels[rows]] = np.inf
+            second[rows] = block.min(axis=1)
+    return labels, np.sqrt(nearest), np.sqrt(second)
+
+
+def _full_distances(X, C, X_sq=None, memory_budget=DISTANCE_MEMORY_BUDGET):
+    """To'liq n x k masofalar matritsasi (Elkan chegaralari uchun)"""
+    distances = np.empty((len(X), len(C)))
+    for rows, block in _squared_distance_blocks(X, C, X_sq, memory_budget):
+        np.sqrt(block, out=distances[rows])
+    return distances
+
+
+def _center_distances(C):
+    """Markazlar orasidagi masofalar va har bir markaz uchun s = 0.5 * eng yaqin qo'shni"""
+    distances = np.sqrt(np.sum((C[:, None, :] - C[None, :, :]) ** 2, axis=2))
+    others = distances + np.diag(np.full(len(C), np.inf))
+    return distances, 0.5 * others.min(axis=1)
+
+
+def _choose_center(X, closest, rng, n_local_trials):
+    """D² bo'yicha nomzodlardan umumiy potensialni eng ko'p kamaytiradiganini tanlash"""
+    n_samples = len(X)
+    total = closest.sum()
+    if total > 0:
+        cumulative = np.cumsum(closest)
+        candidates = np.searchsorted(cumulative, rng.random_sample(n_local_trials) * total,
+                                     side='right')
+        np.minimum(candidates, n_samples - 1, out=candidates)
+    else:
+        candidates = rng.randint(n_samples, size=n_local_trials)
+
+    best_potential = None
+    for idx in candidates:
+        candidate_closest = np.minimum(closest, np.sum((X - X[idx]) ** 2, axis=1))
+        potential = candidate_closest.sum()
+        if best_potential is None or potential < best_potential:
+            best_potential = potential
+            best_idx = idx
+            best_closest = candidate_closest
+    return best_idx, best_closest
+
+
+def kmeans_plusplus(X, k, rng, X_sq=None, n_local_trials=None):
+    """k-means++ usulida boshlang'ich markazlarni tanlash (greedy variant)"""
+    if n_local_trials is None:
+        n_local_trials = 2 + int(np.log(k))
+
+    centers = np.empty((k, X.shape[1]))
+    centers[0] = X[rng.randint(len(X))]
+
+    # Har bir nuqtadan eng yaqin tanlangan markazgacha kvadrat masofa
+    _, closest = assign_nearest(X, centers[:1], X_sq)
+    for i in range(1, k):
+        idx, closest = _choose_center(X, closest, rng, n_local_trials)
+        centers[i] = X[idx]
+    return centers
+
+
+def add_center(X, centers, rng, n_local_trials=None):
+    """Mavjud markazlarga k-means++ qoidasi bilan bitta yangi markaz qo'shish"""
+    if n_local_trials is None:
+        n_local_trials = 2 + int(np.log(len(centers) + 1))
+    _, closest = assign_nearest(X, centers)
+    idx, _ = _choose_center(X, closest, rng, n_local_trials)
+    return np.vstack([centers, X[idx]])
+
+
+def data_hash(X):
+    """Ma'lumotlar massivining kontent xeshi (kesh kaliti uchun)"""
+    X = np.ascontiguousarray(X, dtype=float)
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(str(X.shape).encode())
+    digest.update(X.tobytes())
+    return digest.hexdigest()
+
+
+def _kmeans_single_run(model, X, X_sq, seed):
+    """Bitta mustaqil K-Means ishga tushirish (process pool uchun)"""
+    return model._single_run(X, X_sq, np.random.RandomState(seed))
+
+
 class KMeans:
-    def __init__(self, k=3, max_iters=100, random_state=None):
+    # Shundan kichik datasetlarda process pool ochish o'zini oqlamaydi
+    PARALLEL_MIN_SAMPLES = 20000
+
+    ALGORITHMS = ('lloyd', 'elkan', 'hamerly')
+
+    def __init__(self, k=3, max_iters=100, random_state=None, init='k-means++',
+                 n_init=1, n_jobs=None, algorithm='lloyd',
+                 memory_budget=DISTANCE_MEMORY_BUDGET):
+        if algorithm not in self.ALGORITHMS:
+            raise ValueError(f"Noma'lum algoritm: {algorithm}")
         self.k = k
         self.max_iters = max_iters
         self.random_state = random_state
+        self.init = init
+        self.n_init = n_init
+        self.n_jobs = n_jobs
+        self.algorithm = algorithm
+        self.memory_budget = memory_budget
         self.centroids = None
         self.labels = None
         self.inertia_ = None  # Sum of squared distances
         self.n_iter_ = 0
+        # Har bir iteratsiyada hisoblanmagan (chegaralar bilan o'tkazilgan) masofalar
+        self.distances_skipped_ = []
+        self.n_distances_skipped_ = 0
 
     def fit(self, X):
-        if self.random_state is not None:
-            np.random.seed(self.random_state)
+        # Markazlashtirish kengaytirilgan formulaning aniqligini saqlaydi
+        X = np.asarray(X, dtype=float)
+        X_mean = X.mean(axis=0)
+        X = X - X_mean
+        X_sq = np.einsum('ij,ij->i', X, X)
+
+        # Tayyor markazlar berilsa (warm start) bitta ishga tushirish yetarli
+        init_centroids = None
+        n_init = self.n_init
+        if isinstance(self.init, np.ndarray):
+            init_centroids = np.asarray(self.init, dtype=float) - X_mean
+            n_init = 1
+
+        # Har bir qayta ishga tushirish uchun alohida seed
+        seeds = np.random.RandomState(self.random_state).randint(
+            np.iinfo(np.int32).max, size=n_init)
+
+        n_jobs = self._effective_n_jobs(len(X)) if n_init > 1 else 1
+        if n_jobs > 1:
+            with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+                runs = list(executor.map(_kmeans_single_run, repeat(self), repeat(X),
+                                         repeat(X_sq), seeds))
+        else:
+            runs = [self._single_run(X, X_sq, np.random.RandomState(seed), init_centroids)
+                    for seed in seeds]
+
+        # Eng kichik inertiali natijani saqlash
+        centroids, labels, inertia, n_iter, skipped = min(runs, key=lambda run: run[2])
+        self.centroids = centroids + X_mean
+        self.labels = labels
+        self.inertia_ = inertia
+        self.n_iter_ = n_iter
+        self.distances_skipped_ = skipped
+        self.n_distances_skipped_ = int(sum(skipped))
+        return self
+
+    def _effective_n_jobs(self, n_samples):
+        if self.n_init <= 1 or n_samples < self.PARALLEL_MIN_SAMPLES:
+            return 1
+        n_jobs = self.n_jobs if self.n_jobs is not None else (os.cpu_count() or 1)
+        return max(1, min(n_jobs, self.n_init))
+
+    def _init_centroids(self, X, X_sq, rng):
+        if self.init == 'random':
+            return X[rng.choice(len(X), self.k, replace=False)]
+        return kmeans_plusplus(X, self.k, rng, X_sq)
 
-        # Tasodifiy boshlang'ich markazlar
-        random_indices = np.random.choice(len(X), self.k, replace=False)
-        self.centroids = X[random_indices].astype(float)
+    def _single_run(self, X, X_sq, rng, centroids=None):
+        """Bitta ishga tushirish: (markazlar, yorliqlar, inertia, iteratsiyalar, o'tkazilganlar)"""
+        if centroids is None:
+            centroids = self._init_centroids(X, X_sq, rng)
+        else:
+            centroids = centroids.copy()
+        if self.algorithm == 'elkan':
+            return self._run_elkan(X, X_sq, centroids, rng)
+        if self.algorithm == 'hamerly':
+            return self._run_hamerly(X, X_sq, centroids, rng)
+        return self._run_lloyd(X, X_sq, centroids, rng)
 
+    def _run_lloyd(self, X, X_sq, centroids, rng):
+        n_iter = self.max_iters
         for iteration in range(self.max_iters):
             # Klasterlarga biriktirish
-            old_labels = self.labels
-            self.labels = self._assign_clusters(X)
+            labels, min_distances = assign_nearest(X, centroids, X_sq, self.memory_budget)
 
             # Yangi markazlarni hisoblash
-            new_centroids = self._calculate_centroids(X, self.labels)
+            new_centroids = self._calculate_centroids(X, labels, rng)
 
             # Konvergensiya tekshiruvi
-            if np.allclose(self.centroids, new_centroids):
-                self.n_iter_ = iteration + 1
+            if np.allclose(centroids, new_centroids):
+                n_iter = iteration + 1
                 break
 
-            self.centroids = new_centroids
+            centroids = new_centroids
+        else:
+            # Markazlar oxirgi marta siljigan - masofalarni yangilash
+            labels, min_distances = assign_nearest(X, centroids, X_sq, self.memory_budget)
 
-        # Inertia hisoblash
-        self._calculate_inertia(X)
-        return self
+        # Inertia biriktirish masofalaridan olinadi
+        return centroids, labels, float(min_distances.sum()), n_iter, [0] * n_iter
 
-    def _assign_clusters(self, X):
-        distances = np.zeros((len(X), self.k))
-        for i, centroid in enumerate(self.centroids):
-            distances[:, i] = np.sqrt(np.sum((X - centroid) ** 2, axis=1))
-        return np.argmin(distances, axis=1)
+    def _run_hamerly(self, X, X_sq, centroids, rng):
+        """Hamerly: har bir nuqta uchun bitta yuqori va bitta quyi chegara"""
+        n_samples = len(X)
+        labels, upper, lower = _two_nearest(X, centroids, X_sq, self.memory_budget)
+        skipped = []
 
-    def _calculate_centroids(self, X, labels):
-        centroids = np.zeros((self.k, X.shape[1]))
-        for i in range(self.k):
-            cluster_points = X[labels == i]
-            if len(cluster_points) > 0:
-                centroids[i] = np.mean(cluster_points, axis=0)
+        n_iter = self.max_iters
+        for iteration in range(self.max_iters):
+            if iteration == 0:
+                skipped.append(0)
             else:
-                centroids[i] = X[np.random.choice(len(X))]
-        return centroids
+                _, s = _center_distances(centroids)
+                bound = np.maximum(s[labels], lower)
+                computed = 0
 
-    def _calculate_inertia(self, X):
-        """Inertia (SSE) hisoblash"""
-        self.inertia_ = 0
-        for i in range(self.k):
-            cluster_points = X[self.labels == i]
-            if len(cluster_points) > 0:
-                self.inertia_ += np.sum((cluster_points - self.centroids[i]) ** 2)
+                # Chegaradan o'tganlar uchun yuqori chegarani aniqlashtirish
+                candidates = np.flatnonzero(upper > bound)
+                if candidates.size:
+                    upper[candidates] = np.sqrt(np.sum(
+                        (X[candidates] - centroids[labels[candidates]]) ** 2, axis=1))
+                    computed += candidates.size
+                    candidates = candidates[upper[candidates] > bound[candidates]]
+
+                # Qolganlar uchun barcha markazlargacha masofa
+                if candidates.size:
+                    labels[candidates], upper[candidates], lower[candidates] = _two_nearest(
+                        X[candidates], centroids, X_sq[candidates], self.memory_budget)
+                    computed += candidates.size * self.k
+
+                skipped.append(n_samples * self.k - computed)
+
+            new_centroids = self._calculate_centroids(X, labels, rng)
+            if np.allclose(centroids, new_centroids):
+                n_iter = iteration + 1
+                break
+
+            # Markazlar siljishiga qarab chegaralarni yangilash
+            shift = np.sqrt(np.sum((new_centroids - centroids) ** 2, axis=1))
+            centroids = new_centroids
+            upper += shift[labels]
+            if self.k > 1:
+                order = np.argsort(shift)
+                largest, second = shift[order[-1]], shift[order[-2]]
+                lower -= np.where(labels == order[-1], second, largest)
+        else:
+            labels, _ = assign_nearest(X, centroids, X_sq, self.memory_budget)
+
+        inertia = float(np.sum((X - centroids[labels]) ** 2))
+        return centroids, labels, inertia, n_iter, skipped
+
+    def _run_elkan(self, X, X_sq, centroids, rng):
+        """Elkan: har bir nuqta va markaz juftligi uchun quyi chegara"""
+        n_samples = len(X)
+        lower = _full_distances(X, centroids, X_sq, self.memory_budget)
+        labels = np.argmin(lower, axis=1)
+        upper = lower[np.arange(n_samples), labels]
+        skipped = []
+
+        n_iter = self.max_iters
+        for iteration in range(self.max_iters):
+            if iteration == 0:
+                skipped.append(0)
+            else:
+                center_dist, s = _center_distances(centroids)
+                computed = 0
+
+                active = np.flatnonzero(upper > s[labels])
+                if active.size:
+                    own = labels[active]
+                    half = 0.5 * center_dist[own]
+                    candidates = ((upper[active, None] > lower[active])
+                                  & (upper[active, None] > half))
+                    candidates[np.arange(active.size), own] = False
+
+                    need = candidates.any(axis=1)
+                    rows, own, half = active[need], own[need], half[need]
+                    candidates = candidates[need]
+
+                    # Yuqori chegarani aniqlashtirish
+                    own_dist = np.sqrt(np.sum((X[rows] - centroids[own]) ** 2, axis=1))
+                    computed += rows.size
+                    upper[rows] = own_dist
+                    lower[rows, own] = own_dist
+                    candidates &= ((own_dist[:, None] > lower[rows])
+                                   & (own_dist[:, None] > half))
+
+                    # Faqat chegaralar istisno qilmagan juftliklar uchun masofa
+                    pair_rows, pair_cols = np.nonzero(candidates)
+                    dist = np.sqrt(np.sum((X[rows[pair_rows]] - centroids[pair_cols]) ** 2,
+                                          axis=1))
+                    computed += dist.size
+                    lower[rows[pair_rows], pair_cols] = dist
+
+                    block = np.full((rows.size, self.k), np.inf)
+                    block[np.arange(rows.size), own] = own_dist
+                    block[pair_rows, pair_cols] = dist
+                    best = np.argmin(block, axis=1)
+                    labels[rows] = best
+                    upper[rows] = block[np.arange(rows.size), best]
+
+                skipped.append(n_samples * self.k - computed)
+
+            new_centroids = self._calculate_centroids(X, labels, rng)
+            if np.allclose(centroids, new_centroids):
+                n_iter = iteration + 1
+                break
+
+            # Markazlar siljishiga qarab chegaralarni yangilash
+            shift = np.sqrt(np.sum((new_centroids - centroids) ** 2, axis=1))
+            centroids = new_centroids
+            lower -= shift
+            np.maximum(lower, 0, out=lower)
+            upper += shift[labels]
+        else:
+            labels, _ = assign_nearest(X, centroids, X_sq, self.memory_budget)
+
+        inertia = float(np.sum((X - centroids[labels]) ** 2))
+        return centroids, labels, inertia, n_iter, skipped
+
+    def _assign_clusters(self, X):
+        labels, _ = assign_nearest(np.asarray(X, dtype=float), self.centroids,
+                                   memory_budget=self.memory_budget)
+        return labels
+
+    def _calculate_centroids(self, X, labels, rng=np.random):
+        counts = np.bincount(labels, minlength=self.k)
+        sums = np.column_stack([np.bincount(labels, weights=X[:, j], minlength=self.k)
+                                for j in range(X.shape[1])])
+
+        centroids = np.empty_like(sums)
+        filled = counts > 0
+        centroids[filled] = sums[filled] / counts[filled, None]
+        # Bo'sh klasterlar uchun tasodifiy nuqta
+        for i in np.flatnonzero(~filled):
+            centroids[i] = X[rng.randint(len(X))]
+        return centroids
 
     def predict(self, X):
         return self._assign_clusters(X)
@@ -69,8 +391,9 @@ class KMeans:
     def get_cluster_info(self):
         """Har bir klaster haqida ma'lumot"""
         info = []
+        counts = np.bincount(self.labels, minlength=self.k)
         for i in range(self.k):
-            n_points = np.sum(self.labels == i)
+            n_points = counts[i]
             info.append({
                 'cluster_id': i,
                 'n_points': n_points,
@@ -80,18 +403,494 @@ class KMeans:
         return info
 
 
+class MiniBatchKMeans(KMeans):
+    """Katta datasetlar uchun mini-batch K-Means (Sculley, 2010)"""
+
+    def __init__(self, k=3, max_iters=300, random_state=None, init='k-means++',
+                 batch_size=1024, init_size=None, max_no_improvement=10, tol=1e-5,
+                 memory_budget=DISTANCE_MEMORY_BUDGET):
+        super().__init__(k=k, max_iters=max_iters, random_state=random_state, init=init,
+                         memory_budget=memory_budget)
+        self.batch_size = batch_size
+        self.init_size = init_size
+        self.max_no_improvement = max_no_improvement
+        self.tol = tol
+
+    def fit(self, X):
+        X = np.asarray(X, dtype=float)
+        X_mean = X.mean(axis=0)
+        X = X - X_mean
+        n_samples = len(X)
+        rng = np.random.RandomState(self.random_state)
+        batch_size = min(self.batch_size, n_samples)
+
+        # Boshlang'ich markazlar kichik tanlanmada k-means++ orqali
+        init_size = self.init_size or max(3 * batch_size, 3 * self.k)
+        init_size = min(init_size, n_samples)
+        sample = X[rng.choice(n_samples, init_size, replace=False)]
+        if isinstance(self.init, np.ndarray):
+            centroids = np.asarray(self.init, dtype=float) - X_mean
+        else:
+            centroids = kmeans_plusplus(sample, self.k, rng)
+        counts = np.zeros(self.k)
+        # Markazlar siljishi uchun chegara dispersiyaga nisbatan
+        shift_tol = self.tol * np.mean(np.var(sample, axis=0))
+
+        best_inertia = None
+        ewa_inertia = None
+        no_improvement = 0
+        self.n_iter_ = self.max_iters
+        for iteration in range(self.max_iters):
+            batch = X[rng.randint(n_samples, size=batch_size)]
+            labels, min_distances = assign_nearest(batch, centroids,
+                                                   memory_budget=self.memory_budget)
+
+            # Markazlarni oqimli o'rtacha bilan yangilash
+            batch_counts = np.bincount(labels, minlength=self.k)
+            batch_sums = np.column_stack([
+                np.bincount(labels, weights=batch[:, j], minlength=self.k)
+                for j in range(X.shape[1])
+            ])
+            counts += batch_counts
+            updated = batch_counts > 0
+            shift = (
+                (batch_sums[updated] - batch_counts[updated, None] * centroids[updated])
+                / counts[updated, None]
+            )
+            centroids[updated] += shift
+
+            if iteration > 0 and np.sum(shift ** 2) <= shift_tol:
+                self.n_iter_ = iteration + 1
+                break
+
+            # Batch inertiasining silliqlangan qiymati bo'yicha to'xtatish
+            batch_inertia = min_distances.mean()
+            if ewa_inertia is None:
+                ewa_inertia = batch_inertia
+            else:
+                alpha = min(1.0, batch_size * 2.0 / (n_samples + 1))
+                ewa_inertia = ewa_inertia * (1 - alpha) + batch_inertia * alpha
+
+            if best_inertia is None or ewa_inertia < best_inertia:
+                best_inertia = ewa_inertia
+                no_improvement = 0
+            else:
+                no_improvement += 1
+                if no_improvement >= self.max_no_improvement:
+                    self.n_iter_ = iteration + 1
+                    break
+
+        # Yakuniy yorliqlar va inertia bitta to'liq o'tishda
+        self.labels, min_distances = assign_nearest(X, centroids,
+                                                    memory_budget=self.memory_budget)
+        self.inertia_ = float(min_distances.sum())
+        self.centroids = centroids + X_mean
+        return self
+
+
+class BruteForceIndex:
+    """Har bir so'rovda barcha nuqtalargacha masofa (tekshirish uchun)"""
+
+    def __init__(self, X, eps, memory_budget=DISTANCE_MEMORY_BUDGET):
+        self.X = X
+        self.eps = eps
+        self.memory_budget = memory_budget
+
+    def query_radius(self, indices):
+        """Har bir nuqta uchun eps radiusdagi qo'shnilar (o'sish tartibida)"""
+        indices = np.asarray(indices)
+        neighbors = []
+        for rows in _chunk_rows(len(indices), len(self.X) * self.X.shape[1],
+                                self.memory_budget):
+            diff = self.X[None, :, :] - self.X[indices[rows], None, :]
+            within = np.sqrt(np.sum(diff ** 2, axis=2)) <= self.eps
+            neighbors.extend(np.flatnonzero(row) for row in within)
+        return neighbors
+
+    def count_radius(self, indices):
+        """Har bir nuqtaning eps radiusdagi qo'shnilari soni (ro'yxatlar qurilmaydi)"""
+        return np.array([len(neighbors) for neighbors in self.query_radius(indices)],
+                        dtype=np.intp)
+
+
+class GridIndex:
+    """2-D ma'lumotlar uchun eps o'lchamli kataklarga bo'lingan indeks"""
+
+    def __init__(self, X, eps, memory_budget=DISTANCE_MEMORY_BUDGET):
+        self.X = X
+        self.eps = eps
+        self.memory_budget = memory_budget
+
+        # Katak eps dan sal kattaroq: aynan eps masofadagi nuqtalar (yaxlitlash
+        # xatolari bilan) ikki katak narida qolmasligi kerak - aks holda 3x3 ularni
+        # ko'rmaydi. Kataklar 1 dan boshlanadi - qo'shnilar manfiy bo'lmasligi uchun
+        cell_size = eps * (1 + 1e-6)
+        cells = np.floor((X - X.min(axis=0)) / cell_size).astype(np.int64) + 1
+        self._stride = int(cells[:, 1].max()) + 3
+        self._keys = cells[:, 0] * self._stride + cells[:, 1]
+
+        self._order = np.argsort(self._keys, kind='stable')
+        sorted_keys = self._keys[self._order]
+        self._cell_keys, self._cell_starts = np.unique(sorted_keys, return_index=True)
+        self._cell_ends = np.append(self._cell_starts[1:], len(X))
+        self._offsets = np.array([dx * self._stride + dy
+                                  for dx in (-1, 0, 1) for dy in (-1, 0, 1)])
+
+    def _cell_points(self, key):
+        """Katak atrofidagi 3x3 kataklardagi nuqtalar"""
+        neighbor_keys = key + self._offsets
+        pos = np.searchsorted(self._cell_keys, neighbor_keys)
+        found = pos < len(self._cell_keys)
+        pos, neighbor_keys = pos[found], neighbor_keys[found]
+        pos = pos[self._cell_keys[pos] == neighbor_keys]
+        return np.concatenate([self._order[self._cell_starts[p]:self._cell_ends[p]]
+                               for p in pos])
+
+    def _within_blocks(self, indices):
+        """(so'rov pozitsiyalari, nomzodlar, eps ichidami matritsasi) bloklari
+
+        So'rovlar kataklar bo'yicha guruhlanadi - har bir katak uchun bitta hisob.
+        """
+        query_keys = self._keys[indices]
+        order = np.argsort(query_keys, kind='stable')
+        group_keys, group_starts = np.unique(query_keys[order], return_index=True)
+        group_ends = np.append(group_starts[1:], len(indices))
+
+        for key, start, end in zip(group_keys, group_starts, group_ends):
+            positions = order[start:end]
+            candidates = np.sort(self._cell_points(key))
+            points = self.X[candidates]
+            for rows in _chunk_rows(len(positions), len(candidates) * self.X.shape[1],
+                                    self.memory_budget):
+                query = self.X[indices[positions[rows]]]
+                diff = points[None, :, :] - query[:, None, :]
+                yield positions[rows], candidates, np.sqrt(np.sum(diff ** 2, axis=2)) <= self.eps
+
+    def query_radius(self, indices):
+        """Har bir nuqta uchun eps radiusdagi qo'shnilar (o'sish tartibida)"""
+        indices = np.asarray(indices)
+        neighbors = [None] * len(indices)
+        for positions, candidates, within in self._within_blocks(indices):
+            for pos, row in zip(positions, within):
+                neighbors[pos] = candidates[row]
+        return neighbors
+
+    def count_radius(self, indices):
+        """Har bir nuqtaning eps radiusdagi qo'shnilari soni (ro'yxatlar qurilmaydi)"""
+        indices = np.asarray(indices)
+        counts = np.zeros(len(indices), dtype=np.intp)
+        for positions, _, within in self._within_blocks(indices):
+            counts[positions] = within.sum(axis=1)
+        return counts
+
+
+class KDTreeIndex:
+    """Ko'p o'lchamli ma'lumotlar uchun KD-tree (scipy.spatial)"""
+
+    def __init__(self, X, eps):
+        from scipy.spatial import cKDTree
+
+        self.X = X
+        self.eps = eps
+        self._tree = cKDTree(X)
+
+    def query_radius(self, indices):
+        """Har bir nuqta uchun eps radiusdagi qo'shnilar (o'sish tartibida)
+
+        cKDTree aynan eps masofadagi juftliklarni (yaxlitlash tufayli) tushirib
+        qoldirishi mumkin, shuning uchun sal kattaroq radius bilan so'rab,
+        BruteForceIndex dagi aniq masofa sharti bilan filtrlanadi.
+        """
+        indices = np.asarray(indices)
+        result = self._tree.query_ball_point(self.X[indices], r=self.eps * (1 + 1e-6),
+                                             return_sorted=True)
+        if len(indices) == 0:
+            return []
+
+        lengths = np.array([len(neighbors) for neighbors in result])
+        flat = np.fromiter((j for neighbors in result for j in neighbors),
+                           dtype=np.intp, count=int(lengths.sum()))
+        owners = np.repeat(indices, lengths)
+        diff = self.X[flat] - self.X[owners]
+        keep = np.sqrt(np.sum(diff ** 2, axis=1)) <= self.eps
+
+        splits = np.cumsum(lengths)[:-1]
+        return [neighbors[mask] for neighbors, mask in
+                zip(np.split(flat, splits), np.split(keep, splits))]
+
+    def count_radius(self, indices):
+        """Qo'shnilar soni (ro'yxatlar qurilmaydi) - chegaradagilar sabab biroz ko'p bo'lishi mumkin"""
+        return np.asarray(self._tree.query_ball_point(
+            self.X[np.asarray(indices)], r=self.eps * (1 + 1e-6), return_length=True),
+            dtype=np.intp)
+
+
+def make_neighbor_index(X, eps, kind='auto'):
+    """Qo'shnilar indeksini tanlash: 'auto', 'grid', 'kdtree' yoki 'brute'"""
+    if kind == 'auto':
+        kind = 'grid' if X.shape[1] == 2 else 'kdtree'
+
+    if kind == 'grid':
+        return GridIndex(X, eps)
+    if kind == 'kdtree':
+        try:
+            return KDTreeIndex(X, eps)
+        except ImportError:
+            return BruteForceIndex(X, eps)
+    if kind == 'brute':
+        return BruteForceIndex(X, eps)
+    raise ValueError(f"Noma'lum indeks turi: {kind}")
+
+
+class NeighborGraph:
+    """Maksimal eps uchun bir marta qurilgan radius grafi (qatorlar masofa bo'yicha saralangan)
+
+    Har qanday eps <= max_eps uchun qo'shnilar qayta masofa hisoblamasdan
+    olinadi, k-distance egri chizig'i ham shu grafdan chiqadi.
+    """
+
+    MAX_EDGES = 5_000_000
+    CACHE_SIZE = 8
+    _cache = OrderedDict()
+
+    def __init__(self, X, max_eps=2.0, index='auto', max_edges=MAX_EDGES, batch_size=4096,
+                 count_batch=256):
+        X = np.asarray(X, dtype=float)
+        self.max_eps = max_eps
+        self.n_samples = len(X)
+
+        neighbor_index = make_neighbor_index(X, max_eps, index)
+
+        # Avval faqat qo'shnilar soni, kichik guruhlarda - zich ma'lumotda
+        # chegaradan oshish ro'yxatlar qurilishidan oldin, tezda aniqlanadi
+        n_edges = 0
+        for start in range(0, self.n_samples, count_batch):
+            batch = np.arange(start, min(start + count_batch, self.n_samples))
+            n_edges += int(neighbor_index.count_radius(batch).sum())
+            if n_edges > max_edges:
+                raise ValueError("Radius grafi xotira chegarasidan oshib ketdi")
+
+        rows, cols, dists = [], [], []
+        n_edges = 0
+        for start in range(0, self.n_samples, batch_size):
+            batch = np.arange(start, min(start + batch_size, self.n_samples))
+            for i, neighbors in zip(batch, neighbor_index.query_radius(batch)):
+                n_edges += len(neighbors)
+                if n_edges > max_edges:
+                    raise ValueError("Radius grafi xotira chegarasidan oshib ketdi")
+                rows.append(np.full(len(neighbors), i))
+                cols.append(neighbors)
+                dists.append(np.sqrt(np.sum((X[neighbors] - X[i]) ** 2, axis=1)))
+
+        rows, cols, dists = np.concatenate(rows), np.concatenate(cols), np.concatenate(dists)
+
+        # CSR: har bir qator ichida masofa bo'yicha saralangan
+        order = np.lexsort((cols, dists, rows))
+        self.indices = cols[order].astype(np.intp)
+        self.distances = dists[order]
+        self.indptr = np.zeros(self.n_samples + 1, dtype=np.intp)
+        np.cumsum(np.bincount(rows, minlength=self.n_samples), out=self.indptr[1:])
+
+    @classmethod
+    def cached(cls, X, max_eps=2.0):
+        """Keshdagi graf (bo'lmasa yoki juda katta bo'lsa None) - yangisi qurilmaydi"""
+        return cls._cache.get((data_hash(X), max_eps))
+
+    @classmethod
+    def for_data(cls, X, max_eps=2.0):
+        """Dataset uchun keshdagi grafni qaytarish yoki qurish (juda katta bo'lsa None)"""
+        key = (data_hash(X), max_eps)
+        if key in cls._cache:
+            cls._cache.move_to_end(key)
+            return cls._cache[key]
+
+        try:
+            graph = cls(X, max_eps=max_eps)
+        except ValueError:
+            graph = None
+
+        cls._cache[key] = graph
+        if len(cls._cache) > cls.CACHE_SIZE:
+            cls._cache.popitem(last=False)
+        return graph
+
+    def counts(self, eps):
+        """Har bir nuqtaning eps radiusdagi qo'shnilari soni"""
+        within = self.distances <= eps
+        return np.add.reduceat(within, self.indptr[:-1]) if len(within) else within
+
+    def neighborhoods(self, eps):
+        """eps <= max_eps uchun qo'shnilar ro'yxati (qatorlar prefiksi)"""
+        if eps > self.max_eps:
+            raise ValueError(f"eps {self.max_eps} dan katta bo'lmasligi kerak")
+        ends = self.indptr[:-1] + self.counts(eps)
+        return [self.indices[start:end] for start, end in zip(self.indptr[:-1], ends)]
+
+    def k_distances(self, k):
+        """Har bir nuqtadan k-chi eng yaqin nuqtagacha masofa (nuqtaning o'zi ham hisobda)
+
+        max_eps dan uzoqdagilar inf bo'ladi.
+        """
+        sizes = np.diff(self.indptr)
+        result = np.full(self.n_samples, np.inf)
+        has_k = sizes >= k
+        result[has_k] = self.distances[self.indptr[:-1][has_k] + k - 1]
+        return result
+
+    def suggest_eps(self, min_pts, min_eps=0.1):
+        """k-distance egri chizig'ining "tirsak" nuqtasi bo'yicha eps tavsiyasi"""
+        curve = np.sort(self.k_distances(min_pts))
+        curve = curve[np.isfinite(curve)]
+        if len(curve) < 3:
+            return self.max_eps
+
+        # Birinchi va oxirgi nuqtani tutashtiruvchi chiziqdan eng uzoq nuqta
+        x = np.linspace(0, 1, len(curve))
+        span = curve[-1] - curve[0]
+        y = (curve - curve[0]) / span if span > 0 else np.zeros_like(curve)
+        knee = np.argmax(x - y)
+        return float(np.clip(round(curve[knee], 2), min_eps, self.max_eps))
+
+
+def connected_components(n_nodes, a, b):
+    """Qirralar (a, b) bo'yicha bog'lamli komponentlar - har bir tugunga komponentdagi eng kichik indeks"""
+    roots = np.arange(n_nodes)
+    if len(a) == 0:
+        return roots
+
+    while True:
+        previous = roots.copy()
+        np.minimum.at(roots, a, roots[b])
+        np.minimum.at(roots, b, roots[a])
+
+        # Pointer jumping - zanjirlarni qisqartirish
+        while True:
+            jumped = roots[roots]
+            if np.array_equal(jumped, roots):
+                break
+            roots = jumped
+
+        if np.array_equal(roots, previous):
+            return roots
+
+
+class LazyNeighborhoods:
+    """Qo'shnilar to'plamlarini kerak bo'lganda, guruhlab so'rash
+
+    Har bir nuqtaning qo'shnilari DBSCAN da bir marta ishlatiladi, shuning
+    uchun olingan to'plam darhol o'chiriladi - xotirada faqat oldindan
+    so'ralgan (keyingi) guruh turadi, barcha qo'shni juftliklari emas.
+    """
+
+    def __init__(self, index, batch_size=NEIGHBOR_BATCH):
+        self.index = index
+        self.batch_size = batch_size
+        self._pending = {}
+
+    def pop(self, point_idx, upcoming=None):
+        """point_idx qo'shnilari; oldindan so'ralmagan bo'lsa upcoming() dagilar bilan birga"""
+        neighbors = self._pending.pop(point_idx, None)
+        if neighbors is not None:
+            return neighbors
+
+        batch = [point_idx]
+        for j in (upcoming() if upcoming is not None else ()):
+            if len(batch) >= self.batch_size:
+                break
+            if j != point_idx and j not in self._pending:
+                batch.append(j)
+
+        result = self.index.query_radius(batch)
+        self._pending.update(zip(batch[1:], result[1:]))
+        return result[0]
+
+
+def _dbscan_partition(X_ext, ext_idx, inner_mask, owned_mask, eps, min_pts, index):
+    """Bitta bo'lak uchun DBSCAN bosqichi (process pool uchun)
+
+    inner (owned + eps) nuqtalarning qo'shnilari ext (owned + 2*eps) ichida to'liq,
+    shuning uchun ularning core holati aniq. Qaytaradi: owned core bayroqlari,
+    owned core nuqtalardan chiqadigan lokal komponentlar va owned core bo'lmagan
+    nuqtalarning core qo'shnilari.
+    """
+    inner = np.flatnonzero(inner_mask)
+    neighbor_index = make_neighbor_index(X_ext, eps, index)
+    empty = np.empty(0, dtype=np.intp)
+
+    # 1-o'tish: faqat qo'shnilar soni - to'plamlar guruh bo'yicha so'raladi va saqlanmaydi
+    core = np.zeros(len(X_ext), dtype=bool)
+    for start in range(0, len(inner), NEIGHBOR_BATCH):
+        batch = inner[start:start + NEIGHBOR_BATCH]
+        core[batch] = [len(nb) >= min_pts for nb in neighbor_index.query_radius(batch)]
+
+    # 2-o'tish: owned nuqtalar. Core qirralar har bir guruhdan keyin (a'zo, vakil)
+    # juftliklariga qisqartiriladi - xotira qirralar soniga emas, nuqtalar soniga bog'liq
+    members, reps = empty, empty
+    border_rows, border_cols = [], []
+    owned_inner = inner[owned_mask[inner]]
+    for start in range(0, len(owned_inner), NEIGHBOR_BATCH):
+        batch = owned_inner[start:start + NEIGHBOR_BATCH]
+        edge_a, edge_b = [members], [reps]
+        for i, neighbors in zip(batch, neighbor_index.query_radius(batch)):
+            core_neighbors = neighbors[core[neighbors]]
+            if core[i]:
+                edge_a.append(np.full(len(core_neighbors), i))
+                edge_b.append(core_neighbors)
+            else:
+                # Core bo'lmagan nuqtaning qo'shnilari min_pts dan kam
+                border_rows.append(np.full(len(core_neighbors), i))
+                border_cols.append(core_neighbors)
+
+        edge_a = np.concatenate(edge_a)
+        edge_b = np.concatenate(edge_b)
+        roots = connected_components(len(X_ext), edge_a, edge_b)
+        members = np.unique(np.concatenate([edge_a, edge_b]))
+        reps = roots[members]
+
+    border_rows = np.concatenate(border_rows) if border_rows else empty
+    border_cols = np.concatenate(border_cols) if border_cols else empty
+
+    # Lokal komponentlar: har bir a'zo -> komponent vakili (global indekslarda)
+    owned = np.flatnonzero(owned_mask)
+    return (ext_idx[owned], core[owned],
+            ext_idx[members], ext_idx[reps],
+            ext_idx[border_rows], ext_idx[border_cols])
+
+
 class DBSCAN:
-    def __init__(self, eps=0.5, min_pts=5):
+    def __init__(self, eps=0.5, min_pts=5, index='auto', neighbor_graph=None, n_jobs=1):
         self.eps = eps
         self.min_pts = min_pts
+        self.index = index
+        self.neighbor_graph = neighbor_graph
+        self.n_jobs = n_jobs
         self.labels = None
         self.core_points = []
         self.n_clusters_ = 0
         self.n_noise_ = 0
 
     def fit(self, X):
+        X = np.asarray(X, dtype=float)
         n_samples = len(X)
         self.labels = np.full(n_samples, -1)
+        self.core_points = []
+
+        n_jobs = (os.cpu_count() or 1) if self.n_jobs == -1 else self.n_jobs
+        if n_jobs > 1 and self.neighbor_graph is None and self.index != 'brute':
+            return self._fit_parallel(X, n_jobs)
+
+        # Tayyor radius grafi bo'lsa - undan; aks holda indeks orqali guruhlab,
+        # kerak bo'lganda ('brute' - eski yo'l, har bir nuqta alohida)
+        self._neighborhoods = None
+        self._lazy = None
+        if self.neighbor_graph is not None and self.eps <= self.neighbor_graph.max_eps:
+            self._neighborhoods = self.neighbor_graph.neighborhoods(self.eps)
+        elif self.index != 'brute':
+            self._lazy = LazyNeighborhoods(make_neighbor_index(X, self.eps, self.index))
+
+        # O(1) tekshiruvlar uchun bitmaplar
+        self._core_mask = np.zeros(n_samples, dtype=bool)
+        self._enqueued = np.zeros(n_samples, dtype=bool)
 
         cluster_id = 0
 
@@ -99,45 +898,133 @@ class DBSCAN:
             if self.labels[i] != -1:
                 continue
 
-            neighbors = self._get_neighbors(X, i)
+            # Keyingi belgilanmagan nuqtalar bilan birga so'raladi
+            neighbors = self._get_neighbors(
+                X, i, lambda: i + 1 + np.flatnonzero(
+                    self.labels[i + 1:i + 1 + 4 * NEIGHBOR_BATCH] == -1))
 
             if len(neighbors) < self.min_pts:
                 self.labels[i] = -2  # Noise
                 continue
 
-            self.core_points.append(i)
+            self._core_mask[i] = True
             self._expand_cluster(X, i, neighbors, cluster_id)
             cluster_id += 1
 
+        self._lazy = None
+        self.core_points = np.flatnonzero(self._core_mask)
         self.n_clusters_ = cluster_id
         self.n_noise_ = np.sum(self.labels == -2)
         return self
 
-    def _get_neighbors(self, X, point_idx):
+    def _fit_parallel(self, X, n_jobs):
+        """Ma'lumotlarni eps chegarali bo'laklarga bo'lib, har birini alohida jarayonda hisoblash"""
+        n_samples = len(X)
+
+        # Eng keng o'q bo'yicha teng sonli nuqtali bo'laklar
+        axis = int(np.argmax(X.max(axis=0) - X.min(axis=0)))
+        coord = X[:, axis]
+        bounds = np.quantile(coord, np.linspace(0, 1, n_jobs + 1))
+        bounds[0], bounds[-1] = -np.inf, np.inf
+
+        tasks = []
+        for lo, hi in zip(bounds[:-1], bounds[1:]):
+            owned = (coord >= lo) & (coord < hi)
+            if not owned.any():
+                continue
+            ext_idx = np.flatnonzero((coord >= lo - 2 * self.eps) & (coord < hi + 2 * self.eps))
+            ext_coord = coord[ext_idx]
+            inner = (ext_coord >= lo - self.eps) & (ext_coord < hi + self.eps)
+            tasks.append((X[ext_idx], ext_idx, inner, owned[ext_idx]))
+
+        with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+            futures = [executor.submit(_dbscan_partition, X_ext, ext_idx, inner, owned,
+                                       self.eps, self.min_pts, self.index)
+                       for X_ext, ext_idx, inner, owned in tasks]
+            results = [future.result() for future in futures]
+
+        core_mask = np.zeros(n_samples, dtype=bool)
+        for owned_idx, owned_core, _, _, _, _ in results:
+            core_mask[owned_idx] = owned_core
+
+        # Chegaradagi umumiy core nuqtalar orqali klasterlarni birlashtirish
+        members = np.concatenate([r[2] for r in results])
+        reps = np.concatenate([r[3] for r in results])
+        roots = connected_components(n_samples, members, reps)
+
+        # Klaster raqamlari ketma-ket algoritmdagidek: eng kichik core indeksi tartibida
+        seeds = np.unique(roots[core_mask])
+        cluster_of_seed = np.full(n_samples, -1)
+        cluster_of_seed[seeds] = np.arange(len(seeds))
+
+        labels = np.full(n_samples, -2)
+        labels[core_mask] = cluster_of_seed[roots[core_mask]]
+
+        # Chegara nuqtalari ketma-ket algoritm qoidasi bo'yicha:
+        # indeksi o'zidan kichik seedli klaster bo'lsa - eng kichigi, aks holda
+        # nuqtani boshlang'ich qo'shnilari orasida ko'rgan birinchi seed
+        border = np.concatenate([r[4] for r in results])
+        neighbor = np.concatenate([r[5] for r in results])
+        neighbor_seed = roots[neighbor]
+
+        earliest = np.full(n_samples, n_samples)
+        np.minimum.at(earliest, border, neighbor_seed)
+        absorbed = np.full(n_samples, n_samples)
+        is_seed = neighbor == neighbor_seed
+        np.minimum.at(absorbed, border[is_seed], neighbor[is_seed])
+
+        non_core = np.flatnonzero(~core_mask)
+        reached = earliest[non_core] < non_core
+        labels[non_core[reached]] = cluster_of_seed[earliest[non_core[reached]]]
+        late = non_core[~reached]
+        late = late[absorbed[late] < n_samples]
+        labels[late] = cluster_of_seed[absorbed[late]]
+
+        self.labels = labels
+        self._core_mask = core_mask
+        self.core_points = np.flatnonzero(core_mask)
+        self.n_clusters_ = len(seeds)
+        self.n_noise_ = np.sum(labels == -2)
+        return self
+
+    def _get_neighbors(self, X, point_idx, upcoming=None):
+        if self._lazy is not None:
+            return self._lazy.pop(point_idx, upcoming)
+        if self._neighborhoods is not None:
+            return self._neighborhoods[point_idx]
         distances = np.sqrt(np.sum((X - X[point_idx]) ** 2, axis=1))
-        return np.where(distances <= self.eps)[0].tolist()
+        return np.where(distances <= self.eps)[0]
 
     def _expand_cluster(self, X, point_idx, neighbors, cluster_id):
-        self.labels[point_idx] = cluster_id
-        queue = list(neighbors)
+        labels = self.labels
+        labels[point_idx] = cluster_id
+
+        # Navbatdagi nuqtalar bitmapda belgilanadi - "in queue" tekshiruvi O(1)
+        neighbors = np.asarray(neighbors)
+        self._enqueued[neighbors] = True
+        queue = deque(neighbors.tolist())
 
         while queue:
-            current_point = queue.pop(0)
+            current_point = queue.popleft()
 
-            if self.labels[current_point] == -2:
-                self.labels[current_point] = cluster_id
+            if labels[current_point] == -2:
+                labels[current_point] = cluster_id
 
-            if self.labels[current_point] != -1:
+            if labels[current_point] != -1:
                 continue
 
-            self.labels[current_point] = cluster_id
-            new_neighbors = self._get_neighbors(X, current_point)
+            labels[current_point] = cluster_id
+            # Navbatning boshidagi hali ko'rilmagan nuqtalar bilan birga so'raladi
+            new_neighbors = np.asarray(self._get_neighbors(
+                X, current_point,
+                lambda: [j for j in islice(queue, 4 * NEIGHBOR_BATCH) if labels[j] == -1]))
 
             if len(new_neighbors) >= self.min_pts:
-                self.core_points.append(current_point)
-                for neighbor in new_neighbors:
-                    if neighbor not in queue and self.labels[neighbor] == -1:
-                        queue.append(neighbor)
+                self._core_mask[current_point] = True
+                fresh = new_neighbors[(labels[new_neighbors] == -1)
+                                      & ~self._enqueued[new_neighbors]]
+                self._enqueued[fresh] = True
+                queue.extend(fresh.tolist())
 
     def get_cluster_info(self):
         """Har bir klaster haqida ma'lumot"""
@@ -152,17 +1039,59 @@ class DBSCAN:
         return info
 
 
+def _elbow_inertia(estimator, X, k):
+    """Bitta K uchun inertia (process pool uchun)"""
+    return estimator(k=k, random_state=42).fit(X).inertia_
+
+
 class ElbowMethod:
     """Optimal K ni topish uchun Elbow Method"""
 
+    # data_hash -> (k_range, inertias) LRU keshi
+    CACHE_SIZE = 32
+    _cache = OrderedDict()
+
+    @classmethod
+    def calculate(cls, X, max_k=10, estimator=KMeans, warm_start=True, n_jobs=1):
+        key = (data_hash(X), max_k, estimator.__name__, warm_start)
+        if key in cls._cache:
+            cls._cache.move_to_end(key)
+            k_range, inertias = cls._cache[key]
+            return list(k_range), list(inertias)
+
+        k_range = range(1, min(max_k + 1, len(X)))
+
+        if warm_start:
+            inertias = cls._warm_sweep(X, k_range, estimator)
+        elif n_jobs > 1:
+            # K qiymatlari bir-biriga bog'liq emas - parallel hisoblash
+            with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+                inertias = list(executor.map(_elbow_inertia, repeat(estimator), repeat(X),
+                                             k_range))
+        else:
+            inertias = [_elbow_inertia(estimator, X, k) for k in k_range]
+
+        cls._cache[key] = (list(k_range), list(inertias))
+        if len(cls._cache) > cls.CACHE_SIZE:
+            cls._cache.popitem(last=False)
+
+        return list(k_range), inertias
+
     @staticmethod
-    def calculate(X, max_k=10):
+    def _warm_sweep(X, k_range, estimator):
+        """Har bir K ni K-1 yechimiga bitta yangi markaz qo'shib boshlash"""
+        X = np.asarray(X, dtype=float)
+        rng = np.random.RandomState(42)
         inertias = []
-        k_range = range(1, min(max_k + 1, len(X)))
+        centroids = None
 
         for k in k_range:
-            kmeans = KMeans(k=k, random_state=42)
+            if centroids is None:
+                kmeans = estimator(k=k, random_state=42)
+            else:
+                kmeans = estimator(k=k, random_state=42, init=add_center(X, centroids, rng))
             kmeans.fit(X)
+            centroids = kmeans.centroids
             inertias.append(kmeans.inertia_)
 
-        return list(k_range), inertias
\ No newline at end of file
+        return inertias
@@ -0,0 +1,309 @@
+# compute.py
+import asyncio
+import multiprocessing
+import os
+import signal
+from collections import deque
+
+import numpy as np
+
+from clustering_engine import KMeans, MiniBatchKMeans, DBSCAN, ElbowMethod, NeighborGraph
+from visualizer import Visualizer
+from dataset_store import open_dataset
+from tracing import collect, span
+import config
+
+
+class ComputeBusy(Exception):
+    """Hisoblash navbati to'lgan"""
+
+
+def _worker_main(conn):
+    """Ishchi jarayon: (fn, args) ni qabul qilib, (ok, natija) qaytaradi
+
+    Ish ichidagi span lar natija lug'atiga 'spans' kaliti bilan qo'shiladi.
+    """
+    # Alohida jarayonlar guruhi - DBSCAN/KMeans ochgan pullar ham birga o'ldiriladi
+    os.setsid()
+    Visualizer.warm_up()
+    while True:
+        try:
+            fn, args = conn.recv()
+        except EOFError:
+            break
+        try:
+            with collect() as spans:
+                result = fn(*args)
+            if isinstance(result, dict):
+                result['spans'] = spans
+            conn.send((True, result))
+        except Exception as e:
+            conn.send((False, e))
+
+
+class _Worker:
+    """Bitta ishchi jarayon va unga ulangan pipe"""
+
+    def __init__(self, ctx):
+        self.conn, child_conn = ctx.Pipe()
+        # daemon emas - ichida DBSCAN/KMeans o'z pullarini ochishi mumkin
+        self.process = ctx.Process(target=_worker_main, args=(child_conn,))
+        self.process.start()
+        child_conn.close()
+
+    async def call(self, fn, args):
+        loop = asyncio.get_running_loop()
+        ready = loop.create_future()
+
+        def on_readable():
+            if not ready.done():
+                ready.set_result(None)
+
+        self.conn.send((fn, args))
+        loop.add_reader(self.conn.fileno(), on_readable)
+        try:
+            await ready
+        finally:
+            loop.remove_reader(self.conn.fileno())
+
+        ok, value = self.conn.recv()
+        if not ok:
+            raise value
+        return value
+
+    def kill(self):
+        try:
+            os.killpg(self.process.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            # setsid() hali chaqirilmagan - guruh yo'q, bolalar ham yo'q
+            self.process.kill()
+        self.process.join()
+        self.conn.close()
+
+
+class ComputeExecutor:
+    """Og'ir hisob-kitoblarni event loop dan tashqarida, ishchi jarayonlarda bajarish
+
+    Bir vaqtda max_workers ta ish bajariladi. run() ni kutayotgan task bekor
+    qilinsa (cancel yoki timeout), ishchi jarayon o'ldiriladi va yangisi
+    ishga tushiriladi.
+
+    affinity (masalan dataset handle) berilsa, ish shu kalitga biriktirilgan
+    ishchiga yuboriladi (u bo'sh bo'lsa) - jarayon ichidagi keshlar
+    (NeighborGraph, ElbowMethod, elbow grafigi) keyingi ishlarda ham ishlaydi.
+    """
+
+    def __init__(self, max_workers=config.COMPUTE_WORKERS):
+        self.max_workers = max_workers
+        self._ctx = multiprocessing.get_context()
+        self._idle = None  # bo'sh ishchilar (ro'yxat)
+        self._waiters = deque()  # bo'sh ishchi kutayotgan future lar
+        self._workers = []
+
+    def start(self):
+        """Ishchi jarayonlarni ishga tushirish (birinchi run() da avtomatik)"""
+        self._idle = []
+        for _ in range(self.max_workers):
+            worker = _Worker(self._ctx)
+            self._workers.append(worker)
+            self._idle.append(worker)
+
+    async def run(self, fn, *args, affinity=None):
+        """fn(*args) ni bo'sh ishchida bajarib, natijasini kutish"""
+        if self._idle is None:
+            self.start()
+
+        worker = await self._acquire(affinity)
+        try:
+            result = await worker.call(fn, args)
+        except (asyncio.CancelledError, EOFError, OSError):
+            # Ish o'rtasida to'xtatildi yoki jarayon o'ldi - jarayonni almashtirish
+            worker = self._replace(worker)
+            raise
+        finally:
+            self._release(worker)
+        return result
+
+    async def _acquire(self, affinity):
+        """Bo'sh ishchi - iloji bo'lsa affinity ga biriktirilgani"""
+        while not self._idle:
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                # Bizga berilgan navbatni keyingi kutuvchiga o'tkazish
+                if waiter.done() and not waiter.cancelled():
+                    self._wake()
+                raise
+
+        if affinity is not None:
+            preferred = self._workers[hash(affinity) % len(self._workers)]
+            if preferred in self._idle:
+                self._idle.remove(preferred)
+                return preferred
+        return self._idle.pop()
+
+    def _release(self, worker):
+        self._idle.append(worker)
+        self._wake()
+
+    def _wake(self):
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+
+    def _replace(self, worker):
+        worker.kill()
+        # O'rni saqlanadi - affinity kalitlari shu ishchiga biriktirilib qoladi
+        position = self._workers.index(worker)
+        new_worker = _Worker(self._ctx)
+        self._workers[position] = new_worker
+        return new_worker
+
+    def shutdown(self):
+        for worker in self._workers:
+            worker.kill()
+        self._workers = []
+        self._idle = None
+
+
+def kmeans_class(X):
+    """Katta datasetlar uchun mini-batch K-Means tanlash"""
+    if len(X) > config.MINIBATCH_THRESHOLD:
+        return MiniBatchKMeans
+    return KMeans
+
+
+def dbscan_jobs(X):
+    """Katta datasetlarda DBSCAN ni bir nechta jarayonda ishlatish"""
+    if len(X) > config.DBSCAN_PARALLEL_THRESHOLD:
+        return config.DBSCAN_N_JOBS
+    return 1
+
+
+def eps_options(k_distances, suggested):
+    """k-distance taqsimotidan epsilon tugmalari uchun qiymatlar"""
+    finite = k_distances[np.isfinite(k_distances)]
+    if len(finite) == 0:
+        return [0.1, 0.2, 0.3, 0.5, 0.8, 1.0]
+
+    values = np.quantile(finite, [0.5, 0.75, 0.9, 0.95, 0.99])
+    values = np.clip(np.round(values, 2), 0.1, config.DBSCAN_MAX_EPS)
+    return sorted({float(v) for v in values} - {suggested})
+
+
+def _fit_kmeans(X, k):
+    if kmeans_class(X) is MiniBatchKMeans:
+        kmeans = MiniBatchKMeans(k=k, random_state=42)
+    else:
+        kmeans = KMeans(k=k, max_iters=config.DEFAULT_KMEANS_ITERATIONS, random_state=42,
+                        n_init=config.DEFAULT_KMEANS_N_INIT,
+                        algorithm=config.DEFAULT_KMEANS_ALGORITHM)
+    return kmeans.fit(X)
+
+
+def _fit_dbscan(X, eps, min_pts, build_graph=True):
+    # build_graph=False - faqat tayyor (keshdagi) graf ishlatiladi
+    if build_graph:
+        graph = NeighborGraph.for_data(X, max_eps=config.DBSCAN_MAX_EPS)
+    else:
+        graph = NeighborGraph.cached(X, max_eps=config.DBSCAN_MAX_EPS)
+    dbscan = DBSCAN(eps=eps, min_pts=min_pts, neighbor_graph=graph, n_jobs=dbscan_jobs(X))
+    return dbscan.fit(X)
+
+
+def elbow_job(path, max_k=10):
+    """Elbow sweep va grafigi"""
+    X = open_dataset(path)
+    with span('fit'):
+        k_range, inertias = ElbowMethod.calculate(X, max_k=max_k, estimator=kmeans_class(X))
+    with span('render'):
+        image = Visualizer.plot_elbow(k_range, inertias).getvalue()
+    return {
+        'k_range': k_range,
+        'inertias': inertias,
+        'image': image,
+    }
+
+
+def dbscan_setup_job(path, min_pts=config.DEFAULT_DBSCAN_MIN_PTS):
+    """Radius grafini qurish, epsilon tavsiyasi va k-distance grafigi"""
+    X = open_dataset(path)
+    with span('fit'):
+        graph = NeighborGraph.for_data(X, max_eps=config.DBSCAN_MAX_EPS)
+    if graph is None:
+        return {'suggested_eps': None, 'eps_values': [0.1, 0.2, 0.3, 0.5, 0.8, 1.0], 'image': None}
+
+    k_distances = graph.k_distances(min_pts)
+    suggested = graph.suggest_eps(min_pts)
+    with span('render'):
+        image = Visualizer.plot_k_distance(k_distances, min_pts, suggested).getvalue()
+    return {
+        'suggested_eps': suggested,
+        'eps_values': eps_options(k_distances, suggested),
+        'image': image,
+    }
+
+
+def kmeans_job(path, k):
+    """K-Means va uning grafigi"""
+    X = open_dataset(path)
+    with span('fit'):
+        kmeans = _fit_kmeans(X, k)
+    with span('render'):
+        image = Visualizer.plot_kmeans(X, kmeans, f"K-Means (K={k})").getvalue()
+    return {
+        'labels': kmeans.labels,
+        'centroids': kmeans.centroids,
+        'cluster_info': kmeans.get_cluster_info(),
+        'n_iter': kmeans.n_iter_,
+        'inertia': kmeans.inertia_,
+        'n_distances_skipped': kmeans.n_distances_skipped_,
+        'image': image,
+    }
+
+
+def dbscan_job(path, eps, min_pts):
+    """DBSCAN va uning grafigi"""
+    X = open_dataset(path)
+    with span('fit'):
+        dbscan = _fit_dbscan(X, eps, min_pts)
+    with span('render'):
+        image = Visualizer.plot_dbscan(X, dbscan, f"DBSCAN (ε={eps}, MinPts={min_pts})").getvalue()
+    return {
+        'labels': dbscan.labels,
+        'cluster_info': dbscan.get_cluster_info(),
+        'n_clusters': dbscan.n_clusters_,
+        'n_noise': int(dbscan.n_noise_),
+        'n_core_points': len(dbscan.core_points),
+        'image': image,
+    }
+
+
+def comparison_job(path, k=3, eps=0.3, min_pts=5):
+    """K-Means va DBSCAN ni taqqoslash"""
+    X = open_dataset(path)
+    with span('kmeans_fit'):
+        kmeans = KMeans(k=k, random_state=42, n_init=config.DEFAULT_KMEANS_N_INIT,
+                        algorithm=config.DEFAULT_KMEANS_ALGORITHM).fit(X)
+    with span('dbscan_fit'):
+        # Bitta eps uchun DBSCAN_MAX_EPS radiusli graf qurish shart emas
+        dbscan = _fit_dbscan(X, eps, min_pts, build_graph=False)
+    with span('render'):
+        image = Visualizer.plot_comparison(X, kmeans, dbscan).getvalue()
+    return {
+        'kmeans': {
+            'n_clusters': kmeans.k,
+            'inertia': kmeans.inertia_,
+            'n_iter': kmeans.n_iter_,
+        },
+        'dbscan': {
+            'n_clusters': dbscan.n_clusters_,
+            'n_noise': int(dbscan.n_noise_),
+            'n_core_points': len(dbscan.core_points),
+        },
+        'image': image,
+    }
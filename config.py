@@ -6,6 +6,9 @@ BOT_TOKEN = ""  # @BotFather dan olingan token
 
 # Database
 DATABASE_PATH = "clustering_bot.db"
+DB_READERS = 4  # O'qish uchun ulanishlar soni
+DB_WRITE_INTERVAL = 0.05  # sekund - shu vaqtda kelgan yozuvlar bitta tranzaksiyada
+DB_WRITE_BATCH = 1000
 
 # Fayllar
 UPLOAD_FOLDER = "data/user_uploads"
@@ -14,14 +17,55 @@ TEMP_FOLDER = "data/temp"
 
 # Maksimum fayllar
 MAX_FILE_SIZE = 10 * 1024 * 1024  # 10 MB
-MAX_ROWS = 10000
+MAX_ROWS = 50000
+UPLOAD_CACHE_MAX_BYTES = 256 * 1024 * 1024  # DATASET_FOLDER dagi upload keshi
+DATASET_STORE_FOLDER = os.path.join(DATASET_FOLDER, "store")  # Memory-mapped datasetlar
+DATASET_STORE_MAX_BYTES = 1024 * 1024 * 1024
+DATASET_TTL = 60 * 60  # sekund - shuncha ishlatilmagan dataset o'chiriladi
+KMEANS_MAX_ROWS = 500000  # K-Means mini-batch rejimida ko'proq qator qabul qiladi
 
 # Default parametrlar
 DEFAULT_KMEANS_K = 3
 DEFAULT_KMEANS_ITERATIONS = 100
+DEFAULT_KMEANS_N_INIT = 4  # k-means++ qayta ishga tushirishlar soni
+DEFAULT_KMEANS_ALGORITHM = 'hamerly'  # 'lloyd', 'elkan' yoki 'hamerly'
+MINIBATCH_THRESHOLD = 50000  # Shundan ko'p qatorda MiniBatchKMeans ishlatiladi
 
 DEFAULT_DBSCAN_EPS = 0.5
 DEFAULT_DBSCAN_MIN_PTS = 5
+DBSCAN_MAX_EPS = 2.0  # Radius grafi shu eps uchun bir marta quriladi
+DBSCAN_MAX_MIN_PTS = 20
+DBSCAN_N_JOBS = os.cpu_count() or 1
+DBSCAN_PARALLEL_THRESHOLD = 20000  # Shundan ko'p qatorda DBSCAN bo'laklarga bo'linadi
+
+# Hisoblash puli
+COMPUTE_WORKERS = os.cpu_count() or 1
+COMPUTE_QUEUE_SIZE = 32  # Navbatda kutishi mumkin bo'lgan ishlar soni
+SCHEDULER_MAX_RUNNING_PER_USER = 1  # Bir foydalanuvchining bir vaqtdagi ishlari
+SCHEDULER_MAX_QUEUED_PER_USER = 3
+JOB_TIMEOUT = 120  # sekund
+
+# Natijalar keshi
+RESULT_CACHE_MAX_BYTES = 64 * 1024 * 1024  # Xotiradagi natijalar uchun
+RESULT_CACHE_FOLDER = os.path.join(TEMP_FOLDER, "results")  # None - disk qatlami o'chiq
+RESULT_CACHE_DISK_MAX_BYTES = 512 * 1024 * 1024
+
+# Grafiklar
+RENDER_RASTER_THRESHOLD = 20000  # Shundan ko'p nuqta zichlik rastri sifatida chiziladi
+RENDER_RASTER_BINS = 300  # Rastr o'lchami (bins x bins)
+RENDER_OVERLAY_MAX_POINTS = 2000  # Rastr rejimida shovqin/core markerlari soni
+RENDER_DPI = 150  # 'document' uchun to'liq o'lcham
+RENDER_TARGET = 'photo'  # 'photo' yoki 'document'
+RENDER_TARGETS = {
+    'photo': ('JPEG', 1280),  # (format, uzun tomon pikselda); 'WEBP' ham bo'ladi
+    'document': ('PNG', None),
+}
+RENDER_QUALITY = 85  # JPEG/WebP sifati
+
+# Kechikish o'lchovlari
+ADMIN_IDS = []  # /perf ni ko'ra oladigan Telegram user_id lar
+TRACE_RETENTION = 24 * 60 * 60  # sekund - xotiradagi histogrammalar shuncha saqlanadi
+PERF_DEFAULT_WINDOW = 60  # daqiqa - /perf oynasi
 
 # Papkalarni yaratish
 for folder in [UPLOAD_FOLDER, DATASET_FOLDER, TEMP_FOLDER]:
@@ -0,0 +1,201 @@
+# data_loader.py
+import io
+import json
+import logging
+import os
+
+import numpy as np
+
+from storage import atomic_write, trim_folder
+import config
+
+logger = logging.getLogger(__name__)
+
+SNIFF_ROWS = 100  # Ustun turlarini aniqlash uchun boshidagi qatorlar
+N_COLUMNS = 2  # Klasterlash uchun olinadigan raqamli ustunlar
+
+
+class UploadError(Exception):
+    """Yuklangan faylni qabul qilib bo'lmaydi (xabar foydalanuvchiga ko'rsatiladi)"""
+
+
+def load_upload(data, file_ext, max_rows):
+    """Xotiradagi fayldan birinchi 2 ta raqamli ustunni o'qish
+
+    Qaytaradi: (X, ustun nomlari)
+    """
+    if file_ext == 'csv':
+        return _load_csv(data, max_rows)
+    if file_ext == 'xlsx':
+        return _load_xlsx(data, max_rows)
+    return _load_xls(data, max_rows)
+
+
+def _numeric_columns(head):
+    """Namuna qatorlaridan birinchi raqamli ustunlar (pozitsiya, nom)"""
+    import pandas as pd
+
+    if len(head.columns) < N_COLUMNS:
+        raise UploadError("❌ Kamida 2 ta ustun bo'lishi kerak!")
+
+    columns = [(i, name) for i, (name, dtype) in enumerate(head.dtypes.items())
+               if pd.api.types.is_numeric_dtype(dtype) and not pd.api.types.is_bool_dtype(dtype)]
+    if len(columns) < N_COLUMNS:
+        raise UploadError("❌ Kamida 2 ta raqamli ustun bo'lishi kerak!")
+    return columns[:N_COLUMNS]
+
+
+def _too_many_rows(max_rows):
+    return UploadError(f"❌ Juda ko'p qator! (Maks: {max_rows})")
+
+
+def _not_numeric(columns):
+    # Namunada raqamli ko'ringan ustunda keyinroq matn uchragan
+    names = ', '.join(str(name) for _, name in columns)
+    return UploadError(f"❌ Ustunlarda ({names}) raqam bo'lmagan qiymatlar bor!")
+
+
+def _load_csv(data, max_rows):
+    import pandas as pd
+
+    head = pd.read_csv(io.BytesIO(data), nrows=SNIFF_ROWS)
+    columns = _numeric_columns(head)
+
+    # Faqat tanlangan ustunlar, qatorlar chegarasi bilan - katta fayl
+    # max_rows + 1 qatordan keyin o'qilmaydi
+    try:
+        df = pd.read_csv(io.BytesIO(data), usecols=[i for i, _ in columns],
+                         nrows=max_rows + 1, dtype=np.float64)
+    except ValueError:
+        raise _not_numeric(columns)
+    if len(df) > max_rows:
+        raise _too_many_rows(max_rows)
+    return df.to_numpy(), [str(name) for _, name in columns]
+
+
+def _load_xlsx(data, max_rows):
+    import pandas as pd
+    from openpyxl import load_workbook
+
+    # read_only - varaq qatorma-qator o'qiladi, butun fayl xotiraga yoyilmaydi
+    workbook = load_workbook(io.BytesIO(data), read_only=True, data_only=True)
+    try:
+        sheet = workbook.worksheets[0]
+        if sheet.max_row is not None and sheet.max_row - 1 > max_rows:
+            raise _too_many_rows(max_rows)
+
+        rows = sheet.iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            raise UploadError("❌ Kamida 2 ta ustun bo'lishi kerak!")
+
+        head_rows = []
+        for row in rows:
+            head_rows.append(row)
+            if len(head_rows) >= SNIFF_ROWS:
+                break
+        head = pd.DataFrame(head_rows, columns=_header_names(header)).infer_objects()
+        columns = _numeric_columns(head)
+        positions = [i for i, _ in columns]
+
+        values = [_pick(row, positions) for row in head_rows]
+        for row in rows:
+            if len(values) >= max_rows:
+                raise _too_many_rows(max_rows)
+            values.append(_pick(row, positions))
+    finally:
+        workbook.close()
+
+    try:
+        X = np.array(values, dtype=np.float64).reshape(-1, N_COLUMNS)
+    except (TypeError, ValueError):
+        raise _not_numeric(columns)
+    return X, [str(name) for _, name in columns]
+
+
+def _pick(row, positions):
+    return [row[i] if i < len(row) else None for i in positions]
+
+
+def _header_names(header):
+    return [name if name is not None else f"Unnamed: {i}" for i, name in enumerate(header)]
+
+
+def _load_xls(data, max_rows):
+    import pandas as pd
+
+    # Eski .xls formati uchun read_only yo'l yo'q - faqat qatorlar chegarasi
+    head = pd.read_excel(io.BytesIO(data), nrows=SNIFF_ROWS)
+    columns = _numeric_columns(head)
+
+    try:
+        df = pd.read_excel(io.BytesIO(data), usecols=[i for i, _ in columns],
+                           nrows=max_rows + 1, dtype=np.float64)
+    except ValueError:
+        raise _not_numeric(columns)
+    if len(df) > max_rows:
+        raise _too_many_rows(max_rows)
+    return df.to_numpy(), [str(name) for _, name in columns]
+
+
+class UploadCache:
+    """Tekshirilgan upload massivlari keshi (Telegram file_unique_id bo'yicha)
+
+    Har bir fayl DATASET_FOLDER da .npy (va ustun nomlari .json) sifatida
+    saqlanadi, shuning uchun qayta yuborilgan fayl yuklab olinmaydi ham,
+    parse ham qilinmaydi.
+    """
+
+    PREFIX = 'upload_'
+
+    def __init__(self, folder=config.DATASET_FOLDER, max_bytes=config.UPLOAD_CACHE_MAX_BYTES):
+        self.folder = folder
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.bytes_saved = 0
+        self.evictions = 0
+        os.makedirs(self.folder, exist_ok=True)
+
+    def _paths(self, file_unique_id):
+        base = os.path.join(self.folder, f"{self.PREFIX}{file_unique_id}")
+        return f"{base}.npy", f"{base}.json"
+
+    def get(self, file_unique_id, file_size=0):
+        """(X, ustun nomlari) yoki None"""
+        array_path, meta_path = self._paths(file_unique_id)
+        try:
+            with open(meta_path) as f:
+                columns = json.load(f)
+            X = np.load(array_path)
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+
+        os.utime(array_path)  # LRU tartibi uchun
+        self.hits += 1
+        self.bytes_saved += file_size
+        logger.info(f"Upload keshdan olindi: hit rate {self.hit_rate():.0%}, "
+                    f"{self.bytes_saved / 1024 / 1024:.1f} MB tejaldi")
+        return X, columns
+
+    def put(self, file_unique_id, X, columns):
+        array_path, meta_path = self._paths(file_unique_id)
+        try:
+            # Avval massiv, keyin meta - meta bo'lsa massiv ham to'liq yozilgan
+            atomic_write(array_path, lambda f: np.save(f, X))
+            with open(meta_path, 'w') as f:
+                json.dump(columns, f)
+        except OSError as e:
+            logger.warning(f"Upload keshga yozilmadi: {e}")
+            return
+        self._trim()
+
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def _trim(self):
+        """Hajm chegarasidan oshsa eng eski fayllarni o'chirish"""
+        self.evictions += trim_folder(self.folder, self.max_bytes, '.npy',
+                                      prefix=self.PREFIX, companions=('.json',))
@@ -1,14 +1,54 @@
 # database.py
+import asyncio
+import logging
 import sqlite3
 import json
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+import numpy as np
 import config
 
+logger = logging.getLogger(__name__)
+
+# user_stats dagi algoritm ustunlari (kmeans_count, dbscan_count, comparison_count)
+ALGORITHM_COLUMNS = {'K-Means': 0, 'DBSCAN': 1, 'Comparison': 2}
+MAX_ID = 2 ** 63 - 1
+
+DATASET_DTYPE = '<f8'  # BLOB dagi default datasetlar turi
+SCHEMA_VERSION = 4  # PRAGMA user_version - jadvallar/seed o'zgarsa oshiriladi
+
 
 class Database:
-    def __init__(self):
-        self.conn = sqlite3.connect(config.DATABASE_PATH, check_same_thread=False)
-        self.create_tables()
+    """SQLite bazasi: WAL, o'qish uchun ulanishlar puli va guruhlab yozuvchi task
+
+    Handlerlar metodlarni await qiladi - event loop hech qachon diskni kutmaydi.
+    Yozuvlar darhol navbatga qo'yiladi va DB_WRITE_INTERVAL ichida kelganlari
+    bitta tranzaksiyada yoziladi.
+    """
+
+    def __init__(self, path=config.DATABASE_PATH):
+        self.path = path
+        # Yozuvchi ulanish - sxema yaratishdan keyin faqat yozuvchi oqimda ishlatiladi
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+
+        self._datasets = {}  # name -> dekodlangan massiv
+        self._dataset_list = None
+        self._queue = None
+        self._writer = None
+        self._write_executor = ThreadPoolExecutor(max_workers=1)
+        self._readers = ThreadPoolExecutor(max_workers=config.DB_READERS)
+        self._local = threading.local()
+
+        # Baza allaqachon tayyor bo'lsa, jadvallar va datasetlar qayta yaratilmaydi
+        version = self.conn.execute('PRAGMA user_version').fetchone()[0]
+        if version < SCHEMA_VERSION:
+            self.create_tables()
+            self.conn.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
 
     def create_tables(self):
         """Ma'lumotlar bazasi jadvallarini yaratish"""
@@ -49,16 +89,99 @@ class Database:
                 description TEXT,
                 n_samples INTEGER,
                 n_features INTEGER,
-                data_json TEXT
+                data_json TEXT,
+                data_blob BLOB,
+                data_dtype TEXT
+            )
+        ''')
+        self._migrate_dataset_blobs()
+
+        # Tarix sahifalari uchun qoplovchi indeks (user_id, id bo'yicha keyset)
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_analyses_user_history
+            ON analyses (user_id, id, algorithm, dataset_name, n_clusters, created_at)
+        ''')
+
+        # Foydalanuvchi statistikasi - add_analysis da yangilanadi, /stats bitta qator o'qiydi
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS user_stats (
+                user_id INTEGER PRIMARY KEY,
+                total INTEGER DEFAULT 0,
+                kmeans_count INTEGER DEFAULT 0,
+                dbscan_count INTEGER DEFAULT 0,
+                comparison_count INTEGER DEFAULT 0,
+                sum_clusters INTEGER DEFAULT 0,
+                last_dataset TEXT
             )
         ''')
+        self._backfill_user_stats()
+
+        # Yuborilgan grafiklarning Telegram file_id lari
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS photo_file_ids (
+                content_hash TEXT PRIMARY KEY,
+                file_id TEXT,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+
+        # Tahlil bosqichlari davomiyligi (tracing.Tracer yozadi)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS perf_spans (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                trace_id TEXT,
+                operation TEXT,
+                user_id INTEGER,
+                stage TEXT,
+                duration_ms REAL,
+                created_at REAL
+            )
+        ''')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_perf_spans_created ON perf_spans (created_at)')
 
         self.conn.commit()
         self._insert_default_datasets()
 
+    def _migrate_dataset_blobs(self):
+        """Eski bazalar: data_json ni binar BLOB formatiga o'tkazish"""
+        cursor = self.conn.cursor()
+        columns = {row[1] for row in cursor.execute('PRAGMA table_info(default_datasets)')}
+        if 'data_blob' not in columns:
+            cursor.execute('ALTER TABLE default_datasets ADD COLUMN data_blob BLOB')
+            cursor.execute('ALTER TABLE default_datasets ADD COLUMN data_dtype TEXT')
+
+        cursor.execute('''
+            SELECT id, data_json FROM default_datasets
+            WHERE data_blob IS NULL AND data_json IS NOT NULL
+        ''')
+        for dataset_id, data_json in cursor.fetchall():
+            X = np.asarray(json.loads(data_json), dtype=DATASET_DTYPE)
+            cursor.execute('''
+                UPDATE default_datasets
+                SET data_blob = ?, data_dtype = ?, data_json = NULL
+                WHERE id = ?
+            ''', (X.tobytes(), DATASET_DTYPE, dataset_id))
+
+        self.conn.commit()
+
+    def _backfill_user_stats(self):
+        """Eski bazalar: user_stats ni mavjud tahlillardan bir marta to'ldirish"""
+        self.conn.execute('''
+            INSERT OR IGNORE INTO user_stats
+            (user_id, total, kmeans_count, dbscan_count, comparison_count,
+             sum_clusters, last_dataset)
+            SELECT user_id, COUNT(*),
+                   SUM(algorithm = 'K-Means'), SUM(algorithm = 'DBSCAN'),
+                   SUM(algorithm = 'Comparison'), COALESCE(SUM(n_clusters), 0),
+                   (SELECT dataset_name FROM analyses AS last
+                    WHERE last.user_id = analyses.user_id ORDER BY id DESC LIMIT 1)
+            FROM analyses
+            GROUP BY user_id
+        ''')
+        self.conn.commit()
+
     def _insert_default_datasets(self):
         """Default datasetlarni kiritish"""
-        import numpy as np
         from sklearn.datasets import make_blobs, make_moons, make_circles
 
         datasets = [
@@ -82,7 +205,7 @@ class Database:
             {
                 'name': 'Tasodifiy Nuqtalar',
                 'description': 'Tasodifiy tarqalgan 500 ta nuqta',
-                'generator': lambda: (np.random.rand(500, 2) * 10, None)
+                'generator': lambda: (np.random.RandomState(42).rand(500, 2) * 10, None)
             }
         ]
 
@@ -90,77 +213,244 @@ class Database:
 
         for ds in datasets:
             X, _ = ds['generator']()
-            data_json = json.dumps(X.tolist())
+            X = np.ascontiguousarray(X, dtype=DATASET_DTYPE)
 
             try:
                 cursor.execute('''
-                    INSERT OR IGNORE INTO default_datasets 
-                    (name, description, n_samples, n_features, data_json)
-                    VALUES (?, ?, ?, ?, ?)
-                ''', (ds['name'], ds['description'], len(X), X.shape[1], data_json))
+                    INSERT OR IGNORE INTO default_datasets
+                    (name, description, n_samples, n_features, data_blob, data_dtype)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                ''', (ds['name'], ds['description'], len(X), X.shape[1],
+                      X.tobytes(), DATASET_DTYPE))
             except:
                 pass
 
         self.conn.commit()
 
-    def add_user(self, user_id, username, first_name, last_name):
+    # --- Yozish: navbatga qo'yiladi, yozuvchi task guruhlab bitta tranzaksiyada yozadi ---
+
+    def _enqueue(self, kind, params):
+        if self._queue is None:
+            self._queue = asyncio.Queue()
+            self._writer = asyncio.create_task(self._write_loop())
+        self._queue.put_nowait((kind, params))
+
+    async def add_user(self, user_id, username, first_name, last_name):
         """Yangi foydalanuvchi qo'shish"""
-        cursor = self.conn.cursor()
-        cursor.execute('''
-            INSERT OR IGNORE INTO users (user_id, username, first_name, last_name)
-            VALUES (?, ?, ?, ?)
-        ''', (user_id, username, first_name, last_name))
-        self.conn.commit()
+        self._enqueue('user', (user_id, username, first_name, last_name))
 
-    def add_analysis(self, user_id, algorithm, dataset_name, parameters,
-                     n_clusters, n_noise_points=0):
+    async def add_analysis(self, user_id, algorithm, dataset_name, parameters,
+                           n_clusters, n_noise_points=0):
         """Tahlil natijasini saqlash"""
-        cursor = self.conn.cursor()
-        cursor.execute('''
-            INSERT INTO analyses 
-            (user_id, algorithm, dataset_name, parameters, n_clusters, n_noise_points)
-            VALUES (?, ?, ?, ?, ?, ?)
-        ''', (user_id, algorithm, dataset_name, json.dumps(parameters),
-              n_clusters, n_noise_points))
+        self._enqueue('analysis', (user_id, algorithm, dataset_name, json.dumps(parameters),
+                                   n_clusters, n_noise_points))
 
-        cursor.execute('''
-            UPDATE users SET total_analyses = total_analyses + 1 
-            WHERE user_id = ?
-        ''', (user_id,))
+    async def save_photo_file_id(self, content_hash, file_id):
+        """Grafik file_id sini saqlash"""
+        self._enqueue('sql', ('''
+            INSERT OR REPLACE INTO photo_file_ids (content_hash, file_id)
+            VALUES (?, ?)
+        ''', (content_hash, file_id)))
 
-        self.conn.commit()
+    async def delete_photo_file_id(self, content_hash):
+        """Yaroqsiz file_id ni o'chirish"""
+        self._enqueue('sql', ('DELETE FROM photo_file_ids WHERE content_hash = ?',
+                              (content_hash,)))
 
-    def get_user_stats(self, user_id):
-        """Foydalanuvchi statistikasi"""
-        cursor = self.conn.cursor()
-        cursor.execute('''
-            SELECT total_analyses, join_date FROM users WHERE user_id = ?
-        ''', (user_id,))
-        return cursor.fetchone()
+    async def add_spans(self, trace_id, operation, user_id, spans):
+        """Bitta tahlil bosqichlari davomiyligini saqlash"""
+        created_at = time.time()
+        self._enqueue('spans', [(trace_id, operation, user_id, stage, seconds * 1000, created_at)
+                                for stage, seconds in spans])
 
-    def get_user_history(self, user_id, limit=10):
-        """Foydalanuvchi tarixi"""
-        cursor = self.conn.cursor()
-        cursor.execute('''
-            SELECT algorithm, dataset_name, n_clusters, created_at 
-            FROM analyses 
-            WHERE user_id = ? 
-            ORDER BY created_at DESC 
+    async def flush(self):
+        """Navbatdagi barcha yozuvlar bazaga yozilishini kutish"""
+        if self._queue is None:
+            return
+        done = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait(('flush', done))
+        await done
+
+    async def close(self):
+        """Qolgan yozuvlarni yozib, ulanishlarni yopish"""
+        await self.flush()
+        if self._writer is not None:
+            self._writer.cancel()
+        self._write_executor.shutdown()
+        self._readers.shutdown()
+        self.conn.close()
+
+    async def _write_loop(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            # Bir oz kutib, shu vaqtda kelgan yozuvlarni bitta tranzaksiyaga yig'ish
+            await asyncio.sleep(config.DB_WRITE_INTERVAL)
+            while not self._queue.empty() and len(batch) < config.DB_WRITE_BATCH:
+                batch.append(self._queue.get_nowait())
+
+            ops = [(kind, params) for kind, params in batch if kind != 'flush']
+            if ops:
+                try:
+                    await loop.run_in_executor(self._write_executor, self._write_batch, ops)
+                except Exception as e:
+                    logger.error(f"Bazaga yozishda xato ({len(ops)} ta yozuv): {e}")
+
+            for kind, done in batch:
+                if kind == 'flush' and not done.done():
+                    done.set_result(None)
+
+    def _write_batch(self, ops):
+        """Yozuvlar guruhini bitta tranzaksiyada bajarish (yozuvchi oqimda)"""
+        users = [params for kind, params in ops if kind == 'user']
+        analyses = [params for kind, params in ops if kind == 'analysis']
+        statements = [params for kind, params in ops if kind == 'sql']
+        spans = [row for kind, params in ops if kind == 'spans' for row in params]
+
+        # Har bir foydalanuvchi uchun bitta UPDATE
+        counts = Counter(params[0] for params in analyses)
+
+        # user_stats uchun guruh ichidagi yig'indilar
+        rollup = {}
+        for user_id, algorithm, dataset_name, _, n_clusters, _ in analyses:
+            row = rollup.setdefault(user_id, [0, 0, 0, 0, 0, None])
+            row[0] += 1
+            if algorithm in ALGORITHM_COLUMNS:
+                row[1 + ALGORITHM_COLUMNS[algorithm]] += 1
+            row[4] += n_clusters or 0
+            row[5] = dataset_name
+
+        with self.conn:
+            self.conn.executemany('''
+                INSERT OR IGNORE INTO users (user_id, username, first_name, last_name)
+                VALUES (?, ?, ?, ?)
+            ''', users)
+            self.conn.executemany('''
+                INSERT INTO analyses
+                (user_id, algorithm, dataset_name, parameters, n_clusters, n_noise_points)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', analyses)
+            self.conn.executemany('''
+                UPDATE users SET total_analyses = total_analyses + ?
+                WHERE user_id = ?
+            ''', [(n, user_id) for user_id, n in counts.items()])
+            self.conn.executemany('''
+                INSERT INTO user_stats
+                (user_id, total, kmeans_count, dbscan_count, comparison_count,
+                 sum_clusters, last_dataset)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (user_id) DO UPDATE SET
+                    total = total + excluded.total,
+                    kmeans_count = kmeans_count + excluded.kmeans_count,
+                    dbscan_count = dbscan_count + excluded.dbscan_count,
+                    comparison_count = comparison_count + excluded.comparison_count,
+                    sum_clusters = sum_clusters + excluded.sum_clusters,
+                    last_dataset = excluded.last_dataset
+            ''', [(user_id, *row) for user_id, row in rollup.items()])
+            self.conn.executemany('''
+                INSERT INTO perf_spans
+                (trace_id, operation, user_id, stage, duration_ms, created_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', spans)
+            for sql, params in statements:
+                self.conn.execute(sql, params)
+
+    # --- O'qish: kichik ulanishlar pulida, event loop bloklanmaydi ---
+
+    def _reader(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._local.conn = conn
+        return conn
+
+    async def _read(self, sql, params=(), one=False):
+        def run():
+            cursor = self._reader().execute(sql, params)
+            return cursor.fetchone() if one else cursor.fetchall()
+        return await asyncio.get_running_loop().run_in_executor(self._readers, run)
+
+    async def get_user_stats(self, user_id):
+        """Foydalanuvchi statistikasi (user_stats dan bitta qator)
+
+        Qaytaradi: (join_date, total, kmeans, dbscan, comparison, sum_clusters, last_dataset)
+        """
+        await self.flush()
+        return await self._read('''
+            SELECT users.join_date, COALESCE(s.total, 0), COALESCE(s.kmeans_count, 0),
+                   COALESCE(s.dbscan_count, 0), COALESCE(s.comparison_count, 0),
+                   COALESCE(s.sum_clusters, 0), s.last_dataset
+            FROM users LEFT JOIN user_stats AS s ON s.user_id = users.user_id
+            WHERE users.user_id = ?
+        ''', (user_id,), one=True)
+
+    async def get_user_history(self, user_id, limit=10, before_id=None, after_id=None):
+        """Foydalanuvchi tarixi - keyset sahifalash (id bo'yicha, yangidan eskiga)
+
+        before_id - shu tahlildan eskilari (keyingi sahifa), after_id - yangilari
+        (oldingi sahifa). Qaytaradi: (qatorlar, eskilari bormi, yangilari bormi).
+        """
+        await self.flush()
+        if after_id is not None:
+            rows = await self._read('''
+                SELECT id, algorithm, dataset_name, n_clusters, created_at
+                FROM analyses
+                WHERE user_id = ? AND id > ?
+                ORDER BY id ASC
+                LIMIT ?
+            ''', (user_id, after_id, limit + 1))
+            has_newer = len(rows) > limit
+            rows = rows[:limit][::-1]
+            return rows, True, has_newer
+
+        rows = await self._read('''
+            SELECT id, algorithm, dataset_name, n_clusters, created_at
+            FROM analyses
+            WHERE user_id = ? AND id < ?
+            ORDER BY id DESC
             LIMIT ?
-        ''', (user_id, limit))
-        return cursor.fetchall()
+        ''', (user_id, before_id if before_id is not None else MAX_ID, limit + 1))
+        has_older = len(rows) > limit
+        return rows[:limit], has_older, before_id is not None
 
-    def get_default_datasets(self):
+    async def get_default_datasets(self):
         """Default datasetlarni olish"""
-        cursor = self.conn.cursor()
-        cursor.execute('SELECT name, description FROM default_datasets')
-        return cursor.fetchall()
+        if self._dataset_list is None:
+            self._dataset_list = await self._read('SELECT name, description FROM default_datasets')
+        return self._dataset_list
 
-    def get_dataset_by_name(self, name):
-        """Dataset ma'lumotlarini olish"""
-        cursor = self.conn.cursor()
-        cursor.execute('SELECT data_json FROM default_datasets WHERE name = ?', (name,))
-        result = cursor.fetchone()
+    async def get_dataset_by_name(self, name):
+        """Dataset ma'lumotlarini olish (faqat o'qish uchun massiv)"""
+        X = self._datasets.get(name)
+        if X is not None:
+            return X
+
+        result = await self._read('''
+            SELECT n_samples, n_features, data_blob, data_dtype
+            FROM default_datasets WHERE name = ?
+        ''', (name,), one=True)
+        if not result:
+            return None
+
+        n_samples, n_features, blob, dtype = result
+        # Nusxasiz dekodlash - massiv BLOB baytlariga qaraydi
+        X = np.frombuffer(blob, dtype=dtype).reshape(n_samples, n_features)
+        self._datasets[name] = X
+        return X
+
+    async def get_spans_since(self, since):
+        """since (unix vaqt) dan keyingi bosqichlar: (stage, duration_ms, created_at)"""
+        await self.flush()
+        return await self._read('''
+            SELECT stage, duration_ms, created_at FROM perf_spans
+            WHERE created_at > ?
+            ORDER BY created_at
+        ''', (since,))
+
+    async def get_photo_file_id(self, content_hash):
+        """Grafik uchun saqlangan file_id"""
+        result = await self._read('SELECT file_id FROM photo_file_ids WHERE content_hash = ?',
+                                  (content_hash,), one=True)
         if result:
-            return json.loads(result[0])
-        return None
\ No newline at end of file
+            return result[0]
+        return None
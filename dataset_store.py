@@ -0,0 +1,117 @@
+# dataset_store.py
+import logging
+import os
+import time
+
+import numpy as np
+
+from clustering_engine import data_hash
+from storage import atomic_write
+import config
+
+logger = logging.getLogger(__name__)
+
+
+class DatasetExpired(Exception):
+    """Dataset vaqti o'tgani yoki xotira chegarasi tufayli o'chirilgan"""
+
+
+def open_dataset(path):
+    """Datasetni nusxa olmasdan (memory-map) ochish - ishchi jarayonlar uchun"""
+    return np.load(path, mmap_mode='r')
+
+
+class DatasetStore:
+    """Tekshirilgan datasetlar uchun memory-mapped .npy ombori
+
+    user_data da massivning o'zi emas, faqat handle (kontent xeshi) saqlanadi.
+    Bir xil dataset bir marta yoziladi. TTL davomida ishlatilmagan handle lar
+    va umumiy hajm chegarasidan oshganlari (eng eskisidan boshlab) o'chiriladi;
+    navbatdagi yoki bajarilayotgan ishi bor (pin qilingan) handle lar qoldiriladi.
+    """
+
+    def __init__(self, folder=config.DATASET_STORE_FOLDER, ttl=config.DATASET_TTL,
+                 max_bytes=config.DATASET_STORE_MAX_BYTES):
+        self.folder = folder
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._last_used = {}  # handle -> oxirgi murojaat vaqti
+        self._sizes = {}  # handle -> fayl hajmi
+        self._pins = {}  # handle -> tugamagan ishlar soni
+        os.makedirs(self.folder, exist_ok=True)
+
+        # Oldingi ishga tushirishdan qolgan fayllar
+        for entry in os.scandir(self.folder):
+            if entry.name.endswith('.npy'):
+                stat = entry.stat()
+                handle = entry.name[:-len('.npy')]
+                self._last_used[handle] = stat.st_mtime
+                self._sizes[handle] = stat.st_size
+
+    @property
+    def nbytes(self):
+        return sum(self._sizes.values())
+
+    def _path(self, handle):
+        return os.path.join(self.folder, f"{handle}.npy")
+
+    def put(self, X):
+        """Massivni omborga yozish va handle qaytarish"""
+        X = np.ascontiguousarray(X, dtype=np.float64)
+        handle = data_hash(X)
+        path = self._path(handle)
+
+        if handle not in self._sizes:
+            atomic_write(path, lambda f: np.save(f, X))
+            self._sizes[handle] = os.path.getsize(path)
+
+        self._last_used[handle] = time.time()
+        self.evict(keep=handle)
+        return handle
+
+    def path(self, handle):
+        """Handle fayl yo'li (ishchiga uzatish uchun); o'chirilgan bo'lsa DatasetExpired"""
+        if handle not in self._sizes:
+            raise DatasetExpired(handle)
+        self._last_used[handle] = time.time()
+        self.evict(keep=handle)
+        return self._path(handle)
+
+    def pin(self, handle):
+        """Ish tugaguncha handle ni o'chirilishdan himoyalash; fayl yo'lini qaytaradi"""
+        path = self.path(handle)
+        self._pins[handle] = self._pins.get(handle, 0) + 1
+        return path
+
+    def unpin(self, handle):
+        count = self._pins.pop(handle, 0) - 1
+        if count > 0:
+            self._pins[handle] = count
+
+    def load(self, handle):
+        """Datasetni memory-map qilib ochish"""
+        return open_dataset(self.path(handle))
+
+    def evict(self, keep=None):
+        """TTL o'tgan va hajm chegarasidan ortiq handle larni o'chirish"""
+        now = time.time()
+        by_age = sorted(self._last_used.items(), key=lambda item: item[1])
+
+        total = self.nbytes
+        for handle, last_used in by_age:
+            if now - last_used <= self.ttl and total <= self.max_bytes:
+                break
+            if handle == keep or handle in self._pins:
+                continue
+            total -= self._sizes.get(handle, 0)
+            self._remove(handle)
+
+    def _remove(self, handle):
+        # Ochiq memory-map lar (ishchilarda) fayl o'chirilgandan keyin ham ishlaydi
+        try:
+            os.remove(self._path(handle))
+        except OSError:
+            pass
+        self._last_used.pop(handle, None)
+        self._sizes.pop(handle, None)
+        logger.info(f"Dataset ombordan o'chirildi: {handle}")
@@ -0,0 +1,131 @@
+# result_cache.py
+import hashlib
+import logging
+import os
+import pickle
+from collections import OrderedDict
+
+from storage import atomic_write, trim_folder
+import config
+
+logger = logging.getLogger(__name__)
+
+
+# Natija tuzilishi o'zgarsa oshiriladi - diskdagi eski yozuvlar ishlatilmaydi
+RESULT_FORMAT = 2
+
+
+def make_key(data_hash, algorithm, **params):
+    """(dataset, algoritm, parametrlar) uchun kesh kaliti"""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(f"v{RESULT_FORMAT}|{config.RENDER_TARGET}|".encode())
+    digest.update(data_hash.encode())
+    digest.update(algorithm.encode())
+    for name in sorted(params):
+        digest.update(f"|{name}={params[name]!r}".encode())
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """Tahlil natijalari (labels, markazlar, klaster ma'lumotlari, rasm) keshi
+
+    Xotira qatlami - baytlar bo'yicha chegaralangan LRU. Disk qatlami
+    (ixtiyoriy) xotiradan chiqarilgan natijalarni ham saqlab qoladi va bot
+    qayta ishga tushganda ham ishlaydi.
+    """
+
+    def __init__(self, max_bytes=config.RESULT_CACHE_MAX_BYTES,
+                 disk_folder=config.RESULT_CACHE_FOLDER,
+                 disk_max_bytes=config.RESULT_CACHE_DISK_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.disk_folder = disk_folder
+        self.disk_max_bytes = disk_max_bytes
+        self._entries = OrderedDict()  # key -> pickle baytlari
+        self.nbytes = 0
+
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.disk_evictions = 0
+
+        if self.disk_folder:
+            os.makedirs(self.disk_folder, exist_ok=True)
+
+    def get(self, key):
+        """Natijani qaytarish (topilmasa None)"""
+        blob = self._entries.get(key)
+        if blob is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return pickle.loads(blob)
+
+        blob = self._read_disk(key)
+        if blob is not None:
+            self.disk_hits += 1
+            self._remember(key, blob)
+            return pickle.loads(blob)
+
+        self.misses += 1
+        return None
+
+    def put(self, key, result):
+        """Natijani ikkala qatlamga yozish"""
+        blob = pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL)
+        self._remember(key, blob)
+        self._write_disk(key, blob)
+
+    def stats(self):
+        """Hisoblagichlar"""
+        return {
+            'entries': len(self._entries),
+            'bytes': self.nbytes,
+            'hits': self.hits,
+            'disk_hits': self.disk_hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'disk_evictions': self.disk_evictions,
+        }
+
+    def _remember(self, key, blob):
+        if len(blob) > self.max_bytes:
+            return
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self.nbytes -= len(old)
+        self._entries[key] = blob
+        self.nbytes += len(blob)
+
+        while self.nbytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self.nbytes -= len(evicted)
+            self.evictions += 1
+
+    def _path(self, key):
+        return os.path.join(self.disk_folder, f"{key}.pkl")
+
+    def _read_disk(self, key):
+        if not self.disk_folder:
+            return None
+        try:
+            with open(self._path(key), 'rb') as f:
+                blob = f.read()
+        except OSError:
+            return None
+        # LRU tartibi uchun
+        os.utime(self._path(key))
+        return blob
+
+    def _write_disk(self, key, blob):
+        if not self.disk_folder or len(blob) > self.disk_max_bytes:
+            return
+        try:
+            atomic_write(self._path(key), lambda f: f.write(blob))
+        except OSError as e:
+            logger.warning(f"Natija diskka yozilmadi: {e}")
+            return
+        self._trim_disk()
+
+    def _trim_disk(self):
+        """Disk qatlamini eng eski fayllardan boshlab qisqartirish"""
+        self.disk_evictions += trim_folder(self.disk_folder, self.disk_max_bytes, '.pkl')
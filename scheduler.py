@@ -0,0 +1,180 @@
+# scheduler.py
+import asyncio
+import logging
+from collections import deque
+
+from compute import ComputeBusy
+import config
+
+logger = logging.getLogger(__name__)
+
+
+class JobCancelled(Exception):
+    """Ish foydalanuvchi tomonidan bekor qilindi"""
+
+
+class JobTimeout(Exception):
+    """Ish ruxsat etilgan vaqtdan oshib ketdi"""
+
+
+class Job:
+    def __init__(self, user_id, fn, args, on_position=None, affinity=None):
+        self.user_id = user_id
+        self.fn = fn
+        self.args = args
+        self.on_position = on_position
+        self.affinity = affinity
+        self.position = None
+        self.future = asyncio.get_running_loop().create_future()
+        self.task = None
+
+
+class JobScheduler:
+    """Foydalanuvchilar orasida navbatma-navbat (round-robin) adolatli rejalashtiruvchi
+
+    - har bir foydalanuvchining bir vaqtda bajarilayotgan ishlari cheklangan
+    - navbatdagi o'rin o'zgarganda on_position(position) chaqiriladi (0 - boshlandi)
+    - cancel_user() navbatdagi va bajarilayotgan ishlarni to'xtatadi
+    - har bir ish timeout dan oshsa ishchi jarayon o'ldiriladi
+    """
+
+    def __init__(self, executor, max_running_per_user=config.SCHEDULER_MAX_RUNNING_PER_USER,
+                 max_queued_per_user=config.SCHEDULER_MAX_QUEUED_PER_USER,
+                 max_queued=config.COMPUTE_QUEUE_SIZE, timeout=config.JOB_TIMEOUT):
+        self.executor = executor
+        self.max_running_per_user = max_running_per_user
+        self.max_queued_per_user = max_queued_per_user
+        self.max_queued = max_queued
+        self.timeout = timeout
+
+        # user_id -> navbatdagi ishlar
+        self._queues = {}
+        self._running = {}
+        self._n_queued = 0
+        # Round-robin: eng uzoq vaqt xizmat ko'rmagan foydalanuvchi birinchi
+        self._last_served = {}
+        self._served = 0
+        self._notifications = set()  # navbat xabarlari task lari
+
+    @property
+    def n_queued(self):
+        return self._n_queued
+
+    @property
+    def n_running(self):
+        return sum(len(jobs) for jobs in self._running.values())
+
+    async def submit(self, user_id, fn, *args, on_position=None, affinity=None):
+        """Ishni navbatga qo'yib, natijasini kutish (affinity - ComputeExecutor.run ga)"""
+        queue = self._queues.get(user_id)
+        if (self._n_queued >= self.max_queued
+                or (queue is not None and len(queue) >= self.max_queued_per_user)):
+            raise ComputeBusy()
+
+        job = Job(user_id, fn, args, on_position, affinity)
+        self._queues.setdefault(user_id, deque()).append(job)
+        self._n_queued += 1
+
+        self._dispatch()
+        await self._notify_positions()
+        return await job.future
+
+    def cancel_user(self, user_id):
+        """Foydalanuvchining barcha ishlarini to'xtatish - to'xtatilganlar sonini qaytaradi"""
+        cancelled = 0
+
+        for job in self._queues.pop(user_id, ()):
+            self._n_queued -= 1
+            if not job.future.done():
+                job.future.set_exception(JobCancelled())
+            cancelled += 1
+
+        for job in list(self._running.get(user_id, ())):
+            job.task.cancel()
+            cancelled += 1
+
+        return cancelled
+
+    def _user_order(self):
+        """Navbatda ishi bor foydalanuvchilar round-robin tartibida"""
+        return sorted(self._queues, key=lambda user_id: self._last_served.get(user_id, -1))
+
+    def _next_job(self):
+        """Ishlash huquqi bor, eng uzoq kutgan foydalanuvchining birinchi ishi"""
+        for user_id in self._user_order():
+            if len(self._running.get(user_id, ())) < self.max_running_per_user:
+                queue = self._queues[user_id]
+                job = queue.popleft()
+                if not queue:
+                    del self._queues[user_id]
+                self._served += 1
+                self._last_served[user_id] = self._served
+                return job
+        return None
+
+    def _dispatch(self):
+        while self.n_running < self.executor.max_workers:
+            job = self._next_job()
+            if job is None:
+                break
+            self._n_queued -= 1
+            self._running.setdefault(job.user_id, set()).add(job)
+            job.task = asyncio.create_task(self._execute(job))
+            # Task boshlanmasdan bekor qilinsa ham chaqiriladi
+            job.task.add_done_callback(lambda task, job=job: self._finished(job, task))
+
+    async def _execute(self, job):
+        await self._report(job, 0)
+        run = self.executor.run(job.fn, *job.args, affinity=job.affinity)
+        return await asyncio.wait_for(run, self.timeout)
+
+    def _finished(self, job, task):
+        """Ish tugadi, xato berdi yoki bekor qilindi - natijani uzatish va joyni bo'shatish"""
+        if not job.future.done():
+            if task.cancelled():
+                job.future.set_exception(JobCancelled())
+            elif isinstance(task.exception(), asyncio.TimeoutError):
+                logger.warning(f"Ish vaqti tugadi: {job.fn.__name__} (user {job.user_id})")
+                job.future.set_exception(JobTimeout())
+            elif task.exception() is not None:
+                job.future.set_exception(task.exception())
+            else:
+                job.future.set_result(task.result())
+
+        running = self._running.get(job.user_id)
+        running.discard(job)
+        if not running:
+            del self._running[job.user_id]
+        self._dispatch()
+
+        notification = asyncio.create_task(self._notify_positions())
+        self._notifications.add(notification)
+        notification.add_done_callback(self._notifications.discard)
+
+    def _positions(self):
+        """Navbatdagi ishlar round-robin tartibida qaysi o'rinda ekanini hisoblash"""
+        positions = {}
+        queues = [list(self._queues[user_id]) for user_id in self._user_order()]
+        position = 0
+        depth = 0
+        while True:
+            layer = [queue[depth] for queue in queues if depth < len(queue)]
+            if not layer:
+                return positions
+            for job in layer:
+                position += 1
+                positions[job] = position
+            depth += 1
+
+    async def _notify_positions(self):
+        for job, position in self._positions().items():
+            await self._report(job, position)
+
+    async def _report(self, job, position):
+        if job.on_position is None or job.position == position:
+            return
+        job.position = position
+        try:
+            await job.on_position(position)
+        except Exception as e:
+            logger.warning(f"Navbat xabarini yangilab bo'lmadi: {e}")
@@ -0,0 +1,52 @@
+# storage.py
+import os
+
+
+def atomic_write(path, write, mode='wb'):
+    """Faylni vaqtinchalik nomga yozib, os.replace bilan almashtirish
+
+    write(f) - ochiq faylga yozuvchi funksiya. O'quvchilar hech qachon chala
+    yozilgan faylni ko'rmaydi.
+    """
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, mode) as f:
+            write(f)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def trim_folder(folder, max_bytes, suffix, prefix='', companions=()):
+    """Papkadagi fayllarni (eng eski mtime dan boshlab) hajm chegarasigacha o'chirish
+
+    companions - asosiy fayl bilan birga o'chiriladigan qo'shimchalar
+    (masalan '.npy' uchun '.json'). O'chirilgan fayllar sonini qaytaradi.
+    """
+    files = []
+    total = 0
+    for entry in os.scandir(folder):
+        if entry.name.startswith(prefix) and entry.name.endswith(suffix):
+            stat = entry.stat()
+            files.append((stat.st_mtime, stat.st_size, entry.path))
+            total += stat.st_size
+
+    files.sort()
+    removed = 0
+    for _, size, path in files:
+        if total <= max_bytes:
+            break
+        base = path[:-len(suffix)]
+        try:
+            for companion in companions:
+                os.remove(base + companion)
+            os.remove(path)
+        except OSError:
+            continue
+        total -= size
+        removed += 1
+    return removed
@@ -0,0 +1,26 @@
+# tests/test_data_loader.py
+import pytest
+
+from data_loader import load_upload, UploadError
+
+
+def test_trailing_blank_lines_do_not_count_as_rows():
+    X, columns = load_upload(b"a,b\n1,2\n3,4\n\n\n\n\n\n\n", 'csv', max_rows=5)
+    assert X.shape == (2, 2)
+    assert columns == ['a', 'b']
+
+
+def test_quoted_multiline_field_is_one_row():
+    X, _ = load_upload(b'a,b,c\n1,2,"x\ny\nz"\n3,4,"q"\n', 'csv', max_rows=2)
+    assert X.shape == (2, 2)
+
+
+def test_too_many_rows():
+    with pytest.raises(UploadError, match="Juda ko'p qator"):
+        load_upload(b"a,b\n" + b"1,2\n" * 10, 'csv', max_rows=5)
+
+
+def test_text_after_sniffed_rows_is_upload_error():
+    rows = "a,b\n" + "".join(f"{i},{i}\n" for i in range(150)) + "abc,1\n"
+    with pytest.raises(UploadError, match="raqam bo'lmagan"):
+        load_upload(rows.encode(), 'csv', max_rows=1000)
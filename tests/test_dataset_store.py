@@ -0,0 +1,30 @@
+# tests/test_dataset_store.py
+import os
+
+import numpy as np
+
+from dataset_store import DatasetStore
+
+
+def _store(tmp_path):
+    # Bitta dataset sig'adigan hajm - har bir put() oldingisini siqib chiqaradi
+    return DatasetStore(folder=str(tmp_path), ttl=3600, max_bytes=1000)
+
+
+def test_put_evicts_oldest_over_budget(tmp_path):
+    store = _store(tmp_path)
+    first = store.put(np.zeros((50, 2)))
+    store.put(np.ones((50, 2)))
+    assert not os.path.exists(store._path(first))
+
+
+def test_pinned_dataset_survives_eviction(tmp_path):
+    store = _store(tmp_path)
+    first = store.put(np.zeros((50, 2)))
+    path = store.pin(first)
+    store.put(np.ones((50, 2)))
+    assert np.load(path).shape == (50, 2)
+
+    store.unpin(first)
+    store.put(np.full((50, 2), 2.0))
+    assert not os.path.exists(path)
@@ -0,0 +1,58 @@
+# tests/test_neighbor_index.py
+import numpy as np
+import pytest
+
+from clustering_engine import BruteForceIndex, GridIndex, KDTreeIndex, DBSCAN, NeighborGraph
+
+
+def _quantized(n=2000, decimals=1, seed=0):
+    """CSV dagidek bir xonali kasrlarga yaxlitlangan nuqtalar - aynan eps masofalar ko'p"""
+    return np.round(np.random.RandomState(seed).randn(n, 2) * 2, decimals)
+
+
+@pytest.mark.parametrize('eps', [0.1, 0.2, 0.3, 0.5])
+def test_grid_matches_brute_force_on_quantized_data(eps):
+    X = _quantized()
+    indices = np.arange(len(X))
+    grid = GridIndex(X, eps).query_radius(indices)
+    brute = BruteForceIndex(X, eps).query_radius(indices)
+    for got, expected in zip(grid, brute):
+        np.testing.assert_array_equal(got, expected)
+
+
+def test_dbscan_grid_matches_brute_force():
+    X = _quantized()
+    grid = DBSCAN(eps=0.2, min_pts=5, index='grid').fit(X)
+    brute = DBSCAN(eps=0.2, min_pts=5, index='brute').fit(X)
+    np.testing.assert_array_equal(grid.labels, brute.labels)
+
+
+@pytest.mark.parametrize('eps', [0.1, 0.3, 0.5, 0.7])
+def test_kdtree_matches_brute_force_on_quantized_data(eps):
+    X = np.round(np.random.RandomState(0).randn(1500, 3), 1)
+    indices = np.arange(len(X))
+    kdtree = KDTreeIndex(X, eps).query_radius(indices)
+    brute = BruteForceIndex(X, eps).query_radius(indices)
+    for got, expected in zip(kdtree, brute):
+        np.testing.assert_array_equal(got, expected)
+
+
+@pytest.mark.parametrize('min_pts', [3, 5, 10])
+def test_dbscan_kdtree_matches_brute_force(min_pts):
+    X = np.round(np.random.RandomState(0).randn(1500, 3), 1)
+    kdtree = DBSCAN(eps=0.5, min_pts=min_pts, index='kdtree').fit(X)
+    brute = DBSCAN(eps=0.5, min_pts=min_pts, index='brute').fit(X)
+    np.testing.assert_array_equal(kdtree.labels, brute.labels)
+
+
+@pytest.mark.parametrize('index', ['grid', 'kdtree'])
+def test_neighbor_graph_gives_up_before_building_lists(index, monkeypatch):
+    X = np.random.RandomState(0).rand(5000, 2)
+
+    def fail(self, indices):
+        raise AssertionError("ro'yxatlar qurilmasligi kerak")
+
+    monkeypatch.setattr(GridIndex, 'query_radius', fail)
+    monkeypatch.setattr(KDTreeIndex, 'query_radius', fail)
+    with pytest.raises(ValueError):
+        NeighborGraph(X, max_eps=2.0, index=index, max_edges=100000)
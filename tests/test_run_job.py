@@ -0,0 +1,51 @@
+# tests/test_run_job.py
+import asyncio
+import importlib
+import types
+
+import pytest
+
+
+class FakeScheduler:
+    """submit() berilgan xatoni ko'taradi"""
+
+    def __init__(self, error):
+        self.error = error
+
+    async def submit(self, user_id, fn, *args, affinity=None, on_position=None):
+        raise self.error
+
+
+class FakeMessage:
+    def __init__(self):
+        self.replies = []
+
+    async def reply_text(self, text, parse_mode=None):
+        self.replies.append(text)
+
+
+@pytest.fixture
+def bot_module(tmp_path, monkeypatch):
+    # bot import qilinganda Database() joriy papkada ochiladi
+    monkeypatch.chdir(tmp_path)
+    return importlib.import_module('bot')
+
+
+def _run(bot_module, error):
+    clustering_bot = object.__new__(bot_module.ClusteringBot)
+    clustering_bot.scheduler = FakeScheduler(error)
+    update = types.SimpleNamespace(effective_user=types.SimpleNamespace(id=1))
+    msg = FakeMessage()
+
+    def job():
+        pass
+
+    result = asyncio.run(clustering_bot.run_job(update, msg, job))
+    return result, msg.replies
+
+
+@pytest.mark.parametrize('error', [EOFError(), OSError("broken pipe"), ValueError("bad data")])
+def test_worker_and_job_errors_get_a_reply(bot_module, error):
+    result, replies = _run(bot_module, error)
+    assert result is None
+    assert len(replies) == 1 and "xatolik" in replies[0]
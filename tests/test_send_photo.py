@@ -0,0 +1,74 @@
+# tests/test_send_photo.py
+import asyncio
+import importlib
+import types
+
+import pytest
+from telegram.error import BadRequest
+
+
+class FakeDatabase:
+    """photo_file_ids jadvalining xotiradagi o'rnini bosuvchi"""
+
+    def __init__(self):
+        self.file_ids = {}
+
+    async def get_photo_file_id(self, content_hash):
+        return self.file_ids.get(content_hash)
+
+    async def save_photo_file_id(self, content_hash, file_id):
+        self.file_ids[content_hash] = file_id
+
+    async def delete_photo_file_id(self, content_hash):
+        self.file_ids.pop(content_hash, None)
+
+
+class FakeMessage:
+    """reply_photo: baytlar - yangi file_id, file_id - qayta ishlatish (yoki BadRequest)"""
+
+    def __init__(self):
+        self.sent = []
+        self.stale = set()
+        self._uploads = 0
+
+    async def reply_photo(self, photo, caption=None, parse_mode=None):
+        self.sent.append(photo)
+        if isinstance(photo, str):
+            if photo in self.stale:
+                raise BadRequest("Wrong file identifier/http url specified")
+            file_id = photo
+        else:
+            self._uploads += 1
+            file_id = f"file-{self._uploads}"
+        return types.SimpleNamespace(photo=[types.SimpleNamespace(file_id=file_id)])
+
+
+@pytest.fixture
+def bot_module(tmp_path, monkeypatch):
+    # bot import qilinganda Database() joriy papkada ochiladi
+    monkeypatch.chdir(tmp_path)
+    bot = importlib.import_module('bot')
+    monkeypatch.setattr(bot, 'db', FakeDatabase())
+    return bot
+
+
+def _send(bot_module, msg, image):
+    clustering_bot = object.__new__(bot_module.ClusteringBot)
+    return asyncio.run(clustering_bot.send_photo(msg, image, caption="test"))
+
+
+def test_first_send_uploads_then_reuses_file_id(bot_module):
+    msg = FakeMessage()
+    _send(bot_module, msg, b"png-bytes")
+    _send(bot_module, msg, b"png-bytes")
+    assert msg.sent == [b"png-bytes", "file-1"]
+
+
+def test_stale_file_id_is_dropped_and_reuploaded(bot_module):
+    msg = FakeMessage()
+    _send(bot_module, msg, b"png-bytes")
+    msg.stale.add("file-1")
+
+    _send(bot_module, msg, b"png-bytes")
+    assert msg.sent == [b"png-bytes", "file-1", b"png-bytes"]
+    assert list(bot_module.db.file_ids.values()) == ["file-2"]
@@ -0,0 +1,155 @@
+# tracing.py
+import bisect
+import logging
+import math
+import time
+import uuid
+from collections import OrderedDict
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+
+import config
+
+logger = logging.getLogger(__name__)
+
+# Histogramma chegaralari (soniya): 1 ms dan ~10 daqiqagacha, har biri 25% katta
+BUCKET_BOUNDS = [0.001 * 1.25 ** i for i in range(61)]
+
+_current = ContextVar('trace', default=None)
+
+
+class Trace:
+    """Bitta so'rov (tahlil) davomidagi bosqichlar"""
+
+    def __init__(self, operation=None, user_id=None):
+        self.id = uuid.uuid4().hex
+        self.operation = operation
+        self.user_id = user_id
+        self.spans = []  # (bosqich, soniya)
+
+    def add(self, stage, seconds):
+        self.spans.append((stage, seconds))
+
+
+@contextmanager
+def span(stage):
+    """Joriy trace ga bosqich davomiyligini yozish (trace bo'lmasa hech narsa qilmaydi)"""
+    trace = _current.get()
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        if trace is not None:
+            trace.add(stage, time.perf_counter() - start)
+
+
+def record(spans, prefix=''):
+    """Tayyor (bosqich, soniya) juftliklarini joriy trace ga qo'shish"""
+    trace = _current.get()
+    if trace is not None:
+        for stage, seconds in spans:
+            trace.add(prefix + stage, seconds)
+
+
+@contextmanager
+def collect():
+    """Ishchi jarayonda: ish ichidagi span larni yig'ish"""
+    trace = Trace()
+    token = _current.set(trace)
+    try:
+        yield trace.spans
+    finally:
+        _current.reset(token)
+
+
+class Histogram:
+    """Logarifmik bucket li davomiylik histogrammasi"""
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKET_BOUNDS) + 1)
+        self.total = 0
+
+    def add(self, seconds):
+        self.counts[bisect.bisect_left(BUCKET_BOUNDS, seconds)] += 1
+        self.total += 1
+
+    def merge(self, other):
+        for i, count in enumerate(other.counts):
+            self.counts[i] += count
+        self.total += other.total
+
+    def percentile(self, q):
+        """q-foizli qiymat (bucket yuqori chegarasi, soniya)"""
+        if not self.total:
+            return None
+        rank = max(1, math.ceil(self.total * q / 100))
+        seen = 0
+        for i, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                return BUCKET_BOUNDS[min(i, len(BUCKET_BOUNDS) - 1)]
+
+
+class Tracer:
+    """Bosqichlar histogrammalari (daqiqalik, xotirada) va ularni bazaga yozish
+
+    Har bir daqiqa uchun alohida histogrammalar saqlanadi, shuning uchun
+    istalgan oyna (TRACE_RETENTION gacha) uchun p50/p95/p99 hisoblanadi.
+    """
+
+    def __init__(self, db, retention=config.TRACE_RETENTION):
+        self.db = db
+        self.retention = retention
+        self._minutes = OrderedDict()  # daqiqa -> {bosqich: Histogram}
+
+    @asynccontextmanager
+    async def trace(self, operation, user_id):
+        """Handler atrofidagi trace; ichma-ich chaqirilsa tashqi trace davom etadi"""
+        if _current.get() is not None:
+            yield _current.get()
+            return
+
+        trace = Trace(operation, user_id)
+        token = _current.set(trace)
+        start = time.perf_counter()
+        try:
+            yield trace
+        finally:
+            _current.reset(token)
+            trace.add(operation, time.perf_counter() - start)
+            self.observe(trace.spans)
+            await self.db.add_spans(trace.id, operation, user_id, trace.spans)
+
+    async def load(self):
+        """Qayta ishga tushganda histogrammalarni bazadagi oxirgi span lardan tiklash"""
+        rows = await self.db.get_spans_since(time.time() - self.retention)
+        for stage, duration_ms, created_at in rows:
+            self.observe([(stage, duration_ms / 1000)], now=created_at)
+        logger.info(f"Kechikish histogrammalari tiklandi: {len(rows)} ta span")
+
+    def observe(self, spans, now=None):
+        """Span larni joriy daqiqa histogrammalariga qo'shish"""
+        minute = int((now or time.time()) // 60)
+        histograms = self._minutes.get(minute)
+        if histograms is None:
+            histograms = self._minutes[minute] = {}
+            while self._minutes and next(iter(self._minutes)) <= minute - self.retention // 60:
+                self._minutes.popitem(last=False)
+        for stage, seconds in spans:
+            histogram = histograms.get(stage)
+            if histogram is None:
+                histogram = histograms[stage] = Histogram()
+            histogram.add(seconds)
+
+    def summary(self, window, now=None):
+        """Oxirgi window soniya uchun {bosqich: (soni, p50, p95, p99)}"""
+        since = int(((now or time.time()) - window) // 60)
+        merged = {}
+        for minute, histograms in self._minutes.items():
+            if minute <= since:
+                continue
+            for stage, histogram in histograms.items():
+                merged.setdefault(stage, Histogram()).merge(histogram)
+
+        return {stage: (h.total, h.percentile(50), h.percentile(95), h.percentile(99))
+                for stage, h in sorted(merged.items())}
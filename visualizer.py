@@ -1,28 +1,243 @@
 # visualizer.py
-import matplotlib.pyplot as plt
-import seaborn as sns
+import logging
+import threading
 import numpy as np
+from collections import OrderedDict
 from io import BytesIO
 
-# Matplotlib backend
-plt.switch_backend('Agg')
+import config
 
-# Stil
-sns.set_style('whitegrid')
-plt.rcParams['figure.facecolor'] = 'white'
-plt.rcParams['axes.facecolor'] = 'white'
+logger = logging.getLogger(__name__)
 
+_mpl = None
 
-class Visualizer:
 
-    @staticmethod
-    def plot_kmeans(X, kmeans, title="K-Means Clustering"):
-        """K-Means natijalarini chizish"""
-        fig, ax = plt.subplots(figsize=(10, 8))
+def _matplotlib():
+    """matplotlib va seaborn stilini birinchi grafikda yuklash (bot tez ishga tushishi uchun)"""
+    global _mpl
+    if _mpl is None:
+        import matplotlib
+        # seaborn pyplot ni import qiladi - backend oldindan tanlanadi
+        matplotlib.use('Agg')
+        import seaborn as sns
+
+        # Stil - faqat rcParams, pyplot holati ishlatilmaydi
+        sns.set_style('whitegrid')
+        matplotlib.rcParams['figure.facecolor'] = 'white'
+        matplotlib.rcParams['axes.facecolor'] = 'white'
+        _mpl = matplotlib
+    return _mpl
+
+
+def _cluster_points(ax, X, labels):
+    """Klaster nuqtalarini chizish - ko'p nuqtada har birini emas, zichlik rastrini
+
+    Qaytaradi: colorbar uchun mappable.
+    """
+    if len(X) <= config.RENDER_RASTER_THRESHOLD:
+        return ax.scatter(X[:, 0], X[:, 1], c=labels,
+                          cmap='viridis', alpha=0.6, s=50, edgecolors='black', linewidth=0.5)
+    return _density_raster(ax, X, labels)
+
+
+def _density_raster(ax, X, labels):
+    """Nuqtalarni bins x bins katakka yig'ib, bitta rasm sifatida chizish
+
+    Har bir katak o'zida eng ko'p uchragan klaster rangida, shaffofligi esa
+    nuqtalar zichligiga qarab (log shkala) tanlanadi.
+    """
+    from matplotlib.cm import ScalarMappable
+    from matplotlib.colors import Normalize
+
+    bins = config.RENDER_RASTER_BINS
+    lo = X.min(axis=0)
+    hi = X.max(axis=0)
+    margin = np.where(hi > lo, hi - lo, 1.0) * 0.02
+    lo, hi = lo - margin, hi + margin
+
+    cell_xy = ((X - lo) / (hi - lo) * bins).astype(np.int64)
+    np.clip(cell_xy, 0, bins - 1, out=cell_xy)
+    cells = cell_xy[:, 1] * bins + cell_xy[:, 0]
+
+    labels = np.asarray(labels, dtype=np.int64)
+    min_label = labels.min()
+    n_labels = labels.max() - min_label + 1
+
+    # (katak, klaster) juftliklari soni; har bir katak uchun eng ko'pi
+    pairs, counts = np.unique(cells * n_labels + (labels - min_label), return_counts=True)
+    pair_cells = pairs // n_labels
+    order = np.lexsort((counts, pair_cells))
+    pair_cells = pair_cells[order]
+    pair_labels = pairs[order] % n_labels + min_label
+    last = np.r_[pair_cells[1:] != pair_cells[:-1], True]
+    filled, dominant = pair_cells[last], pair_labels[last]
+
+    density = np.bincount(cells, minlength=bins * bins)[filled]
+    norm = Normalize(vmin=min_label, vmax=labels.max())
+    cmap = _matplotlib().colormaps['viridis']
+
+    image = np.zeros((bins * bins, 4))
+    image[filled] = cmap(norm(dominant))
+    image[filled, 3] = 0.35 + 0.65 * np.log1p(density) / np.log1p(density.max())
+
+    ax.imshow(image.reshape(bins, bins, 4), extent=(lo[0], hi[0], lo[1], hi[1]),
+              origin='lower', aspect='auto', interpolation='nearest')
+    return ScalarMappable(norm=norm, cmap=cmap)
+
+
+def _overlay_points(indices):
+    """Rastr rejimida shovqin/core overlay lari uchun nuqtalar (vektor, soni cheklangan)"""
+    if len(indices) <= config.RENDER_OVERLAY_MAX_POINTS:
+        return indices
+    rng = np.random.RandomState(0)
+    return np.sort(rng.choice(indices, config.RENDER_OVERLAY_MAX_POINTS, replace=False))
+
+
+def _set_limits(ax, *point_sets):
+    """O'q chegaralarini ma'lumotga moslash (5% chekka, matplotlib kabi)"""
+    points = np.vstack([np.asarray(p, dtype=float).reshape(-1, 2) for p in point_sets if len(p)])
+    lo = points.min(axis=0)
+    hi = points.max(axis=0)
+    margin = np.where(hi > lo, hi - lo, 1.0) * 0.05
+    ax.set_xlim(lo[0] - margin[0], hi[0] + margin[0])
+    ax.set_ylim(lo[1] - margin[1], hi[1] + margin[1])
+
+
+class _Template:
+    """Bitta grafik turi uchun oldindan qurilgan Figure
+
+    O'qlar, yozuvlar, grid va colorbar joyi bir marta yaratiladi; har bir
+    chizishda faqat ma'lumot artistlari almashtiriladi. Joylashuv qat'iy -
+    tight_layout va bbox_inches='tight' har safar hisoblanmaydi.
+    """
+
+    def __init__(self, figsize, axes_rects, colorbar_rect=None):
+        _matplotlib()
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+        self.fig = Figure(figsize=figsize)
+        self.canvas = FigureCanvasAgg(self.fig)
+        self.axes = [self.fig.add_axes(rect) for rect in axes_rects]
+        self.cax = self.fig.add_axes(colorbar_rect) if colorbar_rect else None
+
+    def reset(self):
+        """Oldingi chizishdan qolgan ma'lumot artistlarini olib tashlash"""
+        for ax in self.axes:
+            for artist in list(ax.collections) + list(ax.images) + list(ax.lines):
+                artist.remove()
+            legend = ax.get_legend()
+            if legend is not None:
+                legend.remove()
+        if self.cax is not None:
+            self.cax.clear()
+            self.cax.set_visible(False)
+
+    def colorbar(self, mappable, label='Klaster ID'):
+        self.cax.set_visible(True)
+        cbar = self.fig.colorbar(mappable, cax=self.cax)
+        cbar.set_label(label, fontsize=10)
+
+    def render(self, target=None):
+        """Grafikni kodlash - format va o'lcham target ga qarab ('photo' yoki 'document')"""
+        return _encode(self.fig, self.canvas, target or config.RENDER_TARGET)
+
+
+def _encode(fig, canvas, target):
+    """Figure ni Pillow orqali kodlash
+
+    Format va uzun tomon chegarasi config.RENDER_TARGETS[target] dan olinadi.
+    'photo' - Telegram baribir qayta siqadi, shuning uchun rasm shu chegaragacha
+    kichraytirilib JPEG/WebP da yuboriladi. 'document' - to'liq o'lchamli PNG.
+    """
+    from PIL import Image
+
+    image_format, max_side = config.RENDER_TARGETS[target]
+    dpi = config.RENDER_DPI
+    if max_side:
+        dpi = min(dpi, max_side / max(fig.get_size_inches()))
+    fig.set_dpi(dpi)
+    canvas.draw()
+
+    width, height = canvas.get_width_height()
+    image = Image.frombuffer('RGBA', (width, height), canvas.buffer_rgba(), 'raw', 'RGBA', 0, 1)
+
+    buf = BytesIO()
+    if image_format == 'PNG':
+        image.save(buf, format='PNG')
+    else:
+        image.convert('RGB').save(buf, format=image_format, quality=config.RENDER_QUALITY)
+    logger.info(f"Grafik kodlandi: {image_format} {width}x{height}, {buf.tell() / 1024:.0f} KB")
+
+    buf.seek(0)
+    return buf
+
+
+def _style_axes(ax, title, xlabel, ylabel, title_size=16):
+    ax.set_title(title, fontsize=title_size, fontweight='bold')
+    ax.set_xlabel(xlabel, fontsize=12)
+    ax.set_ylabel(ylabel, fontsize=12)
+    ax.grid(True, alpha=0.3)
+
+
+class Renderer:
+    """Grafiklarni chizuvchi: har bir grafik turi uchun o'z shabloni
+
+    Faqat obyektga yo'naltirilgan Figure/FigureCanvasAgg API ishlatiladi -
+    pyplot global holati yo'q. Har bir oqim (yoki jarayon) o'z Renderer iga ega.
+    """
+
+    def __init__(self):
+        self._templates = {}
+
+    def template(self, name):
+        tpl = self._templates.get(name)
+        if tpl is None:
+            tpl = getattr(self, f'_build_{name}')()
+            self._templates[name] = tpl
+        return tpl
+
+    def warm_up(self):
+        for name in ('kmeans', 'dbscan', 'elbow', 'k_distance', 'comparison'):
+            self.template(name)
+
+    # --- Shablonlar ---
+
+    def _build_kmeans(self):
+        tpl = _Template((10, 8), [[0.08, 0.07, 0.76, 0.87]], colorbar_rect=[0.86, 0.07, 0.025, 0.87])
+        _style_axes(tpl.axes[0], '', 'Feature 1', 'Feature 2')
+        return tpl
+
+    def _build_dbscan(self):
+        return self._build_kmeans()
+
+    def _build_elbow(self):
+        tpl = _Template((10, 6), [[0.1, 0.1, 0.86, 0.82]])
+        _style_axes(tpl.axes[0], 'Elbow Method - Optimal K ni Topish',
+                    'Klasterlar Soni (K)', 'Inertia (SSE)')
+        return tpl
+
+    def _build_k_distance(self):
+        tpl = _Template((10, 6), [[0.1, 0.1, 0.86, 0.82]])
+        _style_axes(tpl.axes[0], 'k-distance grafigi - Epsilon ni Topish',
+                    'Nuqtalar (saralangan)', '')
+        return tpl
+
+    def _build_comparison(self):
+        tpl = _Template((16, 6), [[0.05, 0.1, 0.42, 0.82], [0.55, 0.1, 0.42, 0.82]])
+        _style_axes(tpl.axes[0], 'K-Means', 'Feature 1', 'Feature 2', title_size=14)
+        _style_axes(tpl.axes[1], 'DBSCAN', 'Feature 1', 'Feature 2', title_size=14)
+        return tpl
+
+    # --- Chizish ---
+
+    def kmeans(self, X, kmeans, title, target=None):
+        tpl = self.template('kmeans')
+        tpl.reset()
+        ax = tpl.axes[0]
 
         # Nuqtalarni chizish
-        scatter = ax.scatter(X[:, 0], X[:, 1], c=kmeans.labels,
-                             cmap='viridis', alpha=0.6, s=50, edgecolors='black', linewidth=0.5)
+        scatter = _cluster_points(ax, X, kmeans.labels)
 
         # Markazlarni chizish
         ax.scatter(kmeans.centroids[:, 0], kmeans.centroids[:, 1],
@@ -30,125 +245,165 @@ class Visualizer:
                    linewidth=2, label='Markazlar', zorder=5)
 
         ax.set_title(title, fontsize=16, fontweight='bold')
-        ax.set_xlabel('Feature 1', fontsize=12)
-        ax.set_ylabel('Feature 2', fontsize=12)
         ax.legend(fontsize=10)
-        ax.grid(True, alpha=0.3)
+        _set_limits(ax, X, kmeans.centroids)
 
         # Colorbar
-        cbar = plt.colorbar(scatter, ax=ax)
-        cbar.set_label('Klaster ID', fontsize=10)
-
-        plt.tight_layout()
+        tpl.colorbar(scatter)
+        return tpl.render(target)
 
-        # BytesIO ga saqlash
-        buf = BytesIO()
-        plt.savefig(buf, format='png', dpi=150, bbox_inches='tight')
-        buf.seek(0)
-        plt.close()
-
-        return buf
-
-    @staticmethod
-    def plot_dbscan(X, dbscan, title="DBSCAN Clustering"):
-        """DBSCAN natijalarini chizish"""
-        fig, ax = plt.subplots(figsize=(10, 8))
+    def dbscan(self, X, dbscan, title, target=None):
+        tpl = self.template('dbscan')
+        tpl.reset()
+        ax = tpl.axes[0]
 
         # Noise nuqtalar
         noise_mask = dbscan.labels == -2
 
         # Klaster nuqtalari
         if np.any(~noise_mask):
-            scatter = ax.scatter(X[~noise_mask, 0], X[~noise_mask, 1],
-                                 c=dbscan.labels[~noise_mask], cmap='viridis',
-                                 alpha=0.6, s=50, edgecolors='black', linewidth=0.5)
+            scatter = _cluster_points(ax, X[~noise_mask], dbscan.labels[~noise_mask])
 
             # Colorbar
-            cbar = plt.colorbar(scatter, ax=ax)
-            cbar.set_label('Klaster ID', fontsize=10)
+            tpl.colorbar(scatter)
+
+        # Rastr rejimida overlay lar ham cheklangan sonda chiziladi
+        raster = len(X) > config.RENDER_RASTER_THRESHOLD
 
         # Noise nuqtalar
         if np.any(noise_mask):
-            ax.scatter(X[noise_mask, 0], X[noise_mask, 1],
+            noise_indices = np.flatnonzero(noise_mask)
+            if raster:
+                noise_indices = _overlay_points(noise_indices)
+            ax.scatter(X[noise_indices, 0], X[noise_indices, 1],
                        c='red', marker='x', s=100, alpha=0.8,
                        label=f'Shovqin ({np.sum(noise_mask)} nuqta)', linewidth=2)
 
         # Core points
         if len(dbscan.core_points) > 0:
             core_indices = dbscan.core_points
+            if raster:
+                core_indices = _overlay_points(core_indices)
             ax.scatter(X[core_indices, 0], X[core_indices, 1],
                        facecolors='none', edgecolors='yellow',
                        s=150, linewidth=2, label='Core Points')
 
         ax.set_title(title, fontsize=16, fontweight='bold')
-        ax.set_xlabel('Feature 1', fontsize=12)
-        ax.set_ylabel('Feature 2', fontsize=12)
-        ax.legend(fontsize=10)
-        ax.grid(True, alpha=0.3)
+        if np.any(noise_mask) or len(dbscan.core_points) > 0:
+            ax.legend(fontsize=10)
+        _set_limits(ax, X)
+        return tpl.render(target)
 
-        plt.tight_layout()
+    def elbow(self, k_range, inertias, target=None):
+        tpl = self.template('elbow')
+        tpl.reset()
+        ax = tpl.axes[0]
 
-        buf = BytesIO()
-        plt.savefig(buf, format='png', dpi=150, bbox_inches='tight')
-        buf.seek(0)
-        plt.close()
+        ax.plot(k_range, inertias, 'bo-', linewidth=2, markersize=8)
+        ax.relim()
+        ax.autoscale_view()
+        return tpl.render(target)
+
+    def k_distance(self, k_distances, min_pts, suggested_eps=None, target=None):
+        tpl = self.template('k_distance')
+        tpl.reset()
+        ax = tpl.axes[0]
+
+        curve = np.sort(k_distances[np.isfinite(k_distances)])
+        ax.plot(np.arange(len(curve)), curve, 'b-', linewidth=2)
+
+        if suggested_eps is not None:
+            ax.axhline(suggested_eps, color='red', linestyle='--', linewidth=1.5,
+                       label=f'Tavsiya: ε = {suggested_eps}')
+            ax.legend(fontsize=10)
+
+        ax.set_ylabel(f'{min_pts}-chi qo\'shnigacha masofa', fontsize=12)
+        ax.relim()
+        ax.autoscale_view()
+        return tpl.render(target)
+
+    def comparison(self, X, kmeans, dbscan, target=None):
+        tpl = self.template('comparison')
+        tpl.reset()
+        ax_kmeans, ax_dbscan = tpl.axes
+        raster = len(X) > config.RENDER_RASTER_THRESHOLD
 
-        return buf
+        # K-Means
+        _cluster_points(ax_kmeans, X, kmeans.labels)
+        ax_kmeans.scatter(kmeans.centroids[:, 0], kmeans.centroids[:, 1],
+                          c='red', marker='X', s=300, edgecolors='black', linewidth=2)
+        _set_limits(ax_kmeans, X, kmeans.centroids)
 
-    @staticmethod
-    def plot_elbow(k_range, inertias):
-        """Elbow grafigi"""
-        fig, ax = plt.subplots(figsize=(10, 6))
+        # DBSCAN
+        noise_mask = dbscan.labels == -2
+        if np.any(~noise_mask):
+            _cluster_points(ax_dbscan, X[~noise_mask], dbscan.labels[~noise_mask])
+        if np.any(noise_mask):
+            noise_indices = np.flatnonzero(noise_mask)
+            if raster:
+                noise_indices = _overlay_points(noise_indices)
+            ax_dbscan.scatter(X[noise_indices, 0], X[noise_indices, 1],
+                              c='red', marker='x', s=100, alpha=0.8, linewidth=2)
+        _set_limits(ax_dbscan, X)
+        return tpl.render(target)
 
-        ax.plot(k_range, inertias, 'bo-', linewidth=2, markersize=8)
-        ax.set_xlabel('Klasterlar Soni (K)', fontsize=12)
-        ax.set_ylabel('Inertia (SSE)', fontsize=12)
-        ax.set_title('Elbow Method - Optimal K ni Topish', fontsize=16, fontweight='bold')
-        ax.grid(True, alpha=0.3)
 
-        plt.tight_layout()
+_local = threading.local()
 
-        buf = BytesIO()
-        plt.savefig(buf, format='png', dpi=150, bbox_inches='tight')
-        buf.seek(0)
-        plt.close()
 
-        return buf
+def _renderer():
+    """Joriy oqimning Renderer i"""
+    renderer = getattr(_local, 'renderer', None)
+    if renderer is None:
+        renderer = Renderer()
+        _local.renderer = renderer
+    return renderer
+
+
+class Visualizer:
 
     @staticmethod
-    def plot_comparison(X, kmeans, dbscan):
-        """Ikkalasini taqqoslash"""
-        fig, axes = plt.subplots(1, 2, figsize=(16, 6))
+    def warm_up():
+        """Grafik kutubxonalari va shablonlarni oldindan tayyorlash (ishchi jarayon ishga tushganda)"""
+        _renderer().warm_up()
 
-        # K-Means
-        axes[0].scatter(X[:, 0], X[:, 1], c=kmeans.labels,
-                        cmap='viridis', alpha=0.6, s=50, edgecolors='black', linewidth=0.5)
-        axes[0].scatter(kmeans.centroids[:, 0], kmeans.centroids[:, 1],
-                        c='red', marker='X', s=300, edgecolors='black', linewidth=2)
-        axes[0].set_title('K-Means', fontsize=14, fontweight='bold')
-        axes[0].set_xlabel('Feature 1')
-        axes[0].set_ylabel('Feature 2')
-        axes[0].grid(True, alpha=0.3)
+    @staticmethod
+    def plot_kmeans(X, kmeans, title="K-Means Clustering", target=None):
+        """K-Means natijalarini chizish"""
+        return _renderer().kmeans(X, kmeans, title, target)
 
-        # DBSCAN
-        noise_mask = dbscan.labels == -2
-        if np.any(~noise_mask):
-            axes[1].scatter(X[~noise_mask, 0], X[~noise_mask, 1],
-                            c=dbscan.labels[~noise_mask], cmap='viridis',
-                            alpha=0.6, s=50, edgecolors='black', linewidth=0.5)
-        if np.any(noise_mask):
-            axes[1].scatter(X[noise_mask, 0], X[noise_mask, 1],
-                            c='red', marker='x', s=100, alpha=0.8, linewidth=2)
-        axes[1].set_title('DBSCAN', fontsize=14, fontweight='bold')
-        axes[1].set_xlabel('Feature 1')
-        axes[1].set_ylabel('Feature 2')
-        axes[1].grid(True, alpha=0.3)
+    @staticmethod
+    def plot_dbscan(X, dbscan, title="DBSCAN Clustering", target=None):
+        """DBSCAN natijalarini chizish"""
+        return _renderer().dbscan(X, dbscan, title, target)
+
+    # (k_range, inertias, target) -> rasm baytlari
+    ELBOW_CACHE_SIZE = 32
+    _elbow_cache = OrderedDict()
 
-        plt.tight_layout()
+    @classmethod
+    def plot_elbow(cls, k_range, inertias, target=None):
+        """Elbow grafigi"""
+        target = target or config.RENDER_TARGET
+        key = (tuple(k_range), tuple(float(i) for i in inertias), target)
+        if key in cls._elbow_cache:
+            cls._elbow_cache.move_to_end(key)
+            return BytesIO(cls._elbow_cache[key])
+
+        buf = _renderer().elbow(k_range, inertias, target)
 
-        buf = BytesIO()
-        plt.savefig(buf, format='png', dpi=150, bbox_inches='tight')
-        buf.seek(0)
-        plt.close()
+        cls._elbow_cache[key] = buf.getvalue()
+        if len(cls._elbow_cache) > cls.ELBOW_CACHE_SIZE:
+            cls._elbow_cache.popitem(last=False)
 
-        return buf
\ No newline at end of file
+        return buf
+
+    @staticmethod
+    def plot_k_distance(k_distances, min_pts, suggested_eps=None, target=None):
+        """k-distance grafigi (DBSCAN epsilon tanlash uchun)"""
+        return _renderer().k_distance(k_distances, min_pts, suggested_eps, target)
+
+    @staticmethod
+    def plot_comparison(X, kmeans, dbscan, target=None):
+        """Ikkalasini taqqoslash"""
+        return _renderer().comparison(X, kmeans, dbscan, target)